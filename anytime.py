@@ -0,0 +1,135 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from model import Apple, Snake
+from players import Mixed, Player, manhattan
+
+
+class Anytime(Player):
+    def __init__(
+        self,
+        snake: Snake,
+        apple: Apple,
+        solver=Mixed,
+        deadline: float = 1 / 60,
+        solver_kwargs: dict = None,
+        **kwargs
+    ):
+        """
+        Decide every move within a deadline, e.g. one frame of the GUI. The solver runs on a copy of the game in a
+        background thread: when it has not decided by the deadline, the best move it found so far is taken instead (see
+        best_move) and the search keeps running, its plan and transposition table being there for the next moves.
+        Once a move is made, the state after it is known unless it eats the apple, so the thread decides the next move
+        between two frames, before it is asked for.
+        Only the background thread runs the solver, so the counters of the solver and the ones of this player never
+        update the same entries of the shared Metrics at the same time
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param solver: the Player subclass deciding the moves
+        :param deadline: seconds per move, None for waiting for the solver
+        :param solver_kwargs: Optional. Options of the solver, e.g. {'time_aware': True}
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.deadline = deadline
+        snake_copy, apple_copy = self.snapshot(snake.body, apple.location)
+        self.solver = solver(snake=snake_copy, apple=apple_copy, **self.sub_solver_kwargs, **(solver_kwargs or {}))
+        self.solver.publish_candidate = True
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # The state, (body, apple location), the last submitted decision is for, and the one the background thread
+        # is deciding
+        self.state = None
+        self.future = None
+        self.running = None
+
+    def snapshot(self, body: iter, apple_location: tuple):
+        """
+        :return: (snake, apple), copies of the game the background thread may use while this one moves on
+        """
+        kwargs = dict(
+            cell_size=self.snake.cell_size, cell_width=self.snake.cell_width, cell_height=self.snake.cell_height
+        )
+        snake = Snake(body=body, **kwargs)
+        apple = Apple(**kwargs)
+        apple.location = apple_location
+        return snake, apple
+
+    def decide(self, body: tuple, apple_location: tuple):
+        # The candidate of the last decision is cleared before anyone may take it for this state
+        self.solver.candidate = None
+        self.running = (body, apple_location)
+        snake, apple = self.snapshot(body, apple_location)
+        self.solver.observe(snake=snake, apple=apple)
+        return self.solver.next_node()
+
+    def submit(self, state: tuple):
+        # A decision which has not started yet is for a state which will not come
+        if self.future is not None:
+            self.future.cancel()
+        self.state = state
+        self.future = self.executor.submit(self.decide, *state)
+
+    def quick_move(self):
+        """
+        Move where the tail can still be reached from, as Mixed escapes, then into the largest region left to the
+        snake, the closest to the apple among regions of the same size. This is a few flood fills, well within a frame
+        """
+        board = self.snake.board
+        regions = self.bitboard.move_regions(board=board, head=self.snake.get_head(), tail=self.snake.body[0])
+        if not regions:
+            return None
+        tail_region = self.bitboard.tail_region(board=board, body=self.snake.body)
+        if self.apple.location in regions:
+            # Eating the apple does not move the tail
+            tail = self.bitboard.bit(self.snake.body[0])
+            grown_region = self.bitboard.flood(tail, self.bitboard.free(board) | tail)
+            tail_region = tail_region & ~self.bitboard.bit(self.apple.location) | grown_region
+        return max(
+            regions,
+            key=lambda node: (
+                tail_region >> board.index(node) & 1, regions[node], -manhattan(node, self.apple.location)
+            )
+        )
+
+    def best_move(self, state: tuple):
+        """
+        The best move the solver found so far for state, or quick_move if it has none yet, e.g. before it searched
+        """
+        node = self.solver.candidate if self.running == state else None
+        if node is not None:
+            self.metrics.count('anytime.candidates')
+            return node
+        return self.quick_move()
+
+    def speculate(self, node: tuple):
+        """
+        Start deciding the move after node, if the state after it is known
+        """
+        if node is None or node == self.apple.location or self.snake.dead_checking(head=node, check=True):
+            return
+        self.submit((tuple(self.snake.body)[1:] + (node, ), self.apple.location))
+
+    def next_node(self):
+        state = (tuple(self.snake.body), self.apple.location)
+        self.metrics.count('anytime.moves')
+        if state == self.state:
+            self.metrics.count('anytime.speculation_hits')
+        else:
+            self.submit(state)
+
+        try:
+            node = self.future.result(timeout=self.deadline)
+        except TimeoutError:
+            self.metrics.count('anytime.deadline_misses')
+            node = self.best_move(state)
+        self.speculate(node)
+        return node
+
+    def close(self):
+        """
+        Stop the background thread once its current decision is over
+        """
+        if self.future is not None:
+            self.future.cancel()
+        self.executor.shutdown(wait=False)
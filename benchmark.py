@@ -0,0 +1,175 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+from functools import partial
+from itertools import product
+
+from anytime import Anytime
+from metrics import LatencyHistogram, Metrics
+from solvers import SOLVERS, headless_solvers
+from simulator import Simulator
+
+SUMMARY_FIELDS = [
+    'solver', 'width', 'height', 'games', 'errors', 'mean_score', 'completion_rate', 'death_rate', 'steps_per_apple',
+    'latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms', 'latency_max_ms'
+]
+
+
+def run_game(task):
+    """
+    Play one seeded game in a worker process
+    :param task: (solver, width, height, seed, max_idle_steps, deadline), see run_benchmark
+    :return: dict of the game result, with the Metrics of the game
+    """
+    solver, width, height, seed, max_idle_steps, deadline = task
+    game = {'solver': solver, 'width': width, 'height': height, 'seed': seed}
+
+    player_class = SOLVERS[solver]
+    if deadline is not None:
+        player_class = partial(Anytime, solver=player_class, deadline=deadline)
+    simulator = Simulator(
+        player_class=player_class, seed=seed, max_idle_steps=max_idle_steps, cell_width=width, cell_height=height
+    )
+    try:
+        result = simulator.run()
+    except ValueError as error:
+        # e.g. the Hamiltonian solver on a board without any Hamiltonian cycle
+        game['error'] = str(error)
+        return game
+
+    game.update(
+        score=result.score,
+        steps=result.steps,
+        completed=result.completed,
+        is_dead=result.is_dead,
+        metrics=result.metrics,
+    )
+    return game
+
+
+def summarize(games):
+    """
+    Aggregate games per solver and board size
+    :return: (summary, metrics): list of dicts with SUMMARY_FIELDS, and the merged Metrics of every row
+    """
+    groups = {}
+    for game in games:
+        groups.setdefault((game['solver'], game['width'], game['height']), []).append(game)
+
+    summary = []
+    metrics = []
+    for (solver, width, height), group in groups.items():
+        played = [game for game in group if 'error' not in game]
+        merged = Metrics()
+        for game in played:
+            merged.merge(game['metrics'])
+        decisions = merged.histograms.get('decision', LatencyHistogram())
+        total_score = sum(game['score'] for game in played)
+        total_steps = sum(game['steps'] for game in played)
+
+        def ratio(count):
+            return round(count / len(played), 4) if played else None
+
+        def milliseconds(percent):
+            nanoseconds = decisions.percentile(percent)
+            return round(nanoseconds / 1e6, 4) if nanoseconds is not None else None
+
+        summary.append({
+            'solver': solver,
+            'width': width,
+            'height': height,
+            'games': len(played),
+            'errors': len(group) - len(played),
+            'mean_score': ratio(total_score),
+            'completion_rate': ratio(sum(game['completed'] for game in played)),
+            'death_rate': ratio(sum(game['is_dead'] for game in played)),
+            'steps_per_apple': round(total_steps / total_score, 2) if total_score else None,
+            'latency_p50_ms': milliseconds(50),
+            'latency_p95_ms': milliseconds(95),
+            'latency_p99_ms': milliseconds(99),
+            'latency_max_ms': milliseconds(100),
+        })
+        metrics.append(merged)
+    return summary, metrics
+
+
+def run_benchmark(solvers, sizes, seeds, max_idle_steps=None, workers=None, deadline=None):
+    """
+    Play every (solver, board size, seed) game on a process pool
+    :param solvers: names from SOLVERS
+    :param sizes: list of (width, height)
+    :param seeds: list of random seeds, one game per seed
+    :param max_idle_steps: Optional. Stop a game after this many steps without eating an apple. Defaults to twice the
+    board area, which is enough for any solver going around the board
+    :param workers: Optional. Number of processes, defaults to the number of cores
+    :param deadline: Optional. Seconds per move, the solvers decide every move within it, see anytime.Anytime
+    :return: (games, summary, metrics), see summarize
+    """
+    tasks = [
+        (solver, width, height, seed, max_idle_steps or 2 * width * height, deadline)
+        for solver, (width, height), seed in product(solvers, sizes, seeds)
+    ]
+    with multiprocessing.Pool(processes=workers) as pool:
+        games = pool.map(run_game, tasks, chunksize=1)
+    return (games, ) + summarize(games)
+
+
+def parse_size(size):
+    width, _, height = size.partition('x')
+    return int(width), int(height or width)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark snake solvers over seeded games')
+    parser.add_argument('--solvers', nargs='+', choices=headless_solvers(), default=headless_solvers())
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(12, 12)], help='e.g. 12x12 40x40')
+    parser.add_argument('--seeds', type=int, default=10, help='number of games per solver and board size')
+    parser.add_argument('--max-idle-steps', type=int, help='stop a game after this many steps without an apple')
+    parser.add_argument('--workers', type=int, help='number of processes, defaults to the number of cores')
+    parser.add_argument('--deadline', type=float, help='seconds per move, the solvers decide every move within it')
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--games', action='store_true', help='also report every game (JSON only)')
+    parser.add_argument(
+        '--metrics', action='store_true', help='also report solver counters and stage latencies (JSON only)'
+    )
+    parser.add_argument('--output', help='file to write the report to, defaults to stdout')
+    args = parser.parse_args(argv)
+
+    games, summary, metrics = run_benchmark(
+        solvers=args.solvers,
+        sizes=args.sizes,
+        seeds=range(args.seeds),
+        max_idle_steps=args.max_idle_steps,
+        workers=args.workers,
+        deadline=args.deadline,
+    )
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            writer = csv.DictWriter(output, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(summary)
+        else:
+            report = {'summary': summary}
+            if args.metrics:
+                report['metrics'] = [
+                    dict(solver=row['solver'], width=row['width'], height=row['height'], **merged.to_dict())
+                    for row, merged in zip(summary, metrics)
+                ]
+            if args.games:
+                report['games'] = [{key: value for key, value in game.items() if key != 'metrics'} for game in games]
+            json.dump(report, output, indent=2)
+            output.write('\n')
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+from functools import lru_cache
+
+from model import Base, Board
+
+
+@lru_cache(maxsize=None)
+def masks(cell_width: int, cell_height: int):
+    """
+    Masks of a board size, computed once per board size
+    :return: (full, not_first_column, not_last_column): all cells, all cells but the ones with x == 0, all cells but
+    the ones with x == cell_width - 1
+    """
+    full = (1 << cell_width * cell_height) - 1
+    first_column = sum(1 << y * cell_width for y in range(cell_height))
+    last_column = first_column << cell_width - 1
+    return full, full & ~first_column, full & ~last_column
+
+
+def popcount(bits: int):
+    return bin(bits).count('1')
+
+
+class Bitboard(Base):
+    def __init__(self, **kwargs):
+        """
+        Sets of cells as Python integers, bit Board.index(node) standing for node. A flood fill grows a whole region by
+        one step with a few shifts and masks, instead of visiting its cells one by one
+        """
+        super().__init__(**kwargs)
+        self.full, self.not_first_column, self.not_last_column = masks(self.cell_width, self.cell_height)
+
+    def bit(self, node: tuple):
+        x, y = node
+        return 1 << y * self.cell_width + x
+
+    def free(self, board: Board):
+        return self.full & ~board.bits
+
+    def expand(self, bits: int):
+        """
+        :return: bits and their neighbours. Shifting by one moves cells along their row, the masks stop them from
+        wrapping around to the next row
+        """
+        return (
+            bits | (bits << 1 & self.not_first_column) | (bits >> 1 & self.not_last_column) |
+            (bits << self.cell_width & self.full) | bits >> self.cell_width
+        )
+
+    def flood(self, seeds: int, passable: int, target: int = 0):
+        """
+        :param seeds: cells to start from, which do not need to be passable
+        :param passable: cells the region may grow into
+        :param target: Optional. Stop as soon as the region meets one of these cells
+        :return: the cells reachable from seeds through passable cells, seeds included
+        """
+        passable |= seeds
+        region = seeds
+        while not region & target:
+            grown = self.expand(region) & passable
+            if grown == region:
+                break
+            region = grown
+        return region
+
+    def move_regions(self, board: Board, head: tuple, tail: tuple = None):
+        """
+        Size of the region left to the snake after each move of its head. Free cells cut off by a move are not in its
+        region, so the largest region is the move wasting the fewest cells
+        :param board: Board instance
+        :param head: snake's head
+        :param tail: Optional. Snake's tail, which is free after the move
+        :return: dict of {free neighbour of head: number of free cells reachable from it}
+        """
+        free = self.free(board)
+        if tail is not None:
+            free |= self.bit(tail)
+        regions = {}
+        x, y = head
+        for neighbor in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+            if not board.is_inside(neighbor) or not free & self.bit(neighbor):
+                continue
+            left = free & ~self.bit(neighbor)
+            regions[neighbor] = popcount(self.flood(self.bit(neighbor), left)) - 1
+        return regions
+
+    def splits(self, board: Board, node: tuple, tail: tuple = None):
+        """
+        Whether a move of the head to node cuts the free cells around node into separate regions: then the snake can
+        only go on into one of them, and the cells of the others are wasted
+        :param board: Board instance
+        :param node: free cell next to the snake's head
+        :param tail: Optional. Snake's tail, which is free after the move
+        """
+        free = self.free(board)
+        if tail is not None:
+            free |= self.bit(tail)
+        free &= ~self.bit(node)
+        around = 0
+        for index in board.neighbors[board.index(node)]:
+            around |= 1 << index
+        around &= free
+        # The free cells around node are one region if a flood fill from one of them meets all the others
+        region = around & -around
+        while region & around != around:
+            grown = self.expand(region) & free
+            if grown == region:
+                return True
+            region = grown
+        return False
+
+    def tail_region(self, board: Board, body: list):
+        """
+        Cells from which the snake's tail can be reached once the snake moved one step. The tail is then the node
+        before the last one, and the last one is free
+        :param board: Board instance
+        :param body: snake's body, tail first
+        """
+        tail = self.bit(body[1])
+        return self.flood(tail, self.free(board) | self.bit(body[0]) | tail)
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import random
+
+import numpy as np
+
+from model import DIRECTIONS, Apple, Base, Snake
+from players import DistanceField
+
+FEATURES = ('apple_distance', )
+
+
+class SnakeEnv(Base):
+    def __init__(
+        self,
+        initial_length: int = 3,
+        seed: int = None,
+        features: tuple = (),
+        max_idle_steps: int = None,
+        **kwargs
+    ):
+        """
+        One game of snake driven by an agent, with the reset()/step(action) interface of Gymnasium. The game is a Snake
+        and an Apple, so the rules are the ones of the solvers and the simulator.
+        Observations are a dict of (cell_height, cell_width) NumPy planes which are allocated once and updated in place,
+        reset and step return the same read-only arrays every time: copy them to keep an observation. The 'body' plane
+        counts the body nodes on every cell like Board, the 'head' and 'apple' planes are 0/1. Only their changed cells
+        are written, so a step costs O(1) whatever the board size
+        :param initial_length: The initial length of the snake
+        :param seed: Optional. Seed of the apple locations, for reproducible games
+        :param features: Optional. Extra planes among FEATURES. 'apple_distance' is the number of steps from every cell
+        to the apple around the body, -1 for unreachable cells. It is one flood fill of the board per step
+        :param max_idle_steps: Optional. Truncate a game after this many steps without eating an apple
+        """
+        super().__init__(**kwargs)
+        unknown = set(features) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown features {sorted(unknown)}, should be among {FEATURES}")
+        self.initial_length = initial_length
+        self.features = tuple(features)
+        self.max_idle_steps = max_idle_steps
+        self.random = random.Random(seed)
+
+        shape = (self.cell_height, self.cell_width)
+        # The planes written by the environment, and read-only views of them handed out as the observation
+        self.planes = {
+            'body': np.zeros(shape, dtype=np.uint8),
+            'head': np.zeros(shape, dtype=np.uint8),
+            'apple': np.zeros(shape, dtype=np.uint8),
+        }
+        if 'apple_distance' in self.features:
+            self.planes['apple_distance'] = np.full(shape, -1, dtype=np.int32)
+        self.observation = {}
+        for name, plane in self.planes.items():
+            self.observation[name] = plane.view()
+            self.observation[name].flags.writeable = False
+
+        self.snake = None
+        self.apple = None
+        self.steps = 0
+        self.idle_steps = 0
+
+    def reset(self, seed: int = None):
+        """
+        Start a new game
+        :param seed: Optional. Seed the apple locations again, from this game on
+        :return: (observation, info)
+        """
+        if seed is not None:
+            self.random.seed(seed)
+        kwargs = dict(cell_size=self.cell_size, cell_width=self.cell_width, cell_height=self.cell_height)
+        self.snake = Snake(initial_length=self.initial_length, **kwargs)
+        self.apple = Apple(**kwargs)
+        self.apple.random = self.random
+        self.apple.refresh(snake=self.snake)
+        self.steps = 0
+        self.idle_steps = 0
+
+        # The only time the planes are written in full
+        self.planes['body'][...] = np.frombuffer(self.snake.board.cells, dtype=np.uint8).reshape(
+            self.cell_height, self.cell_width
+        )
+        self.planes['head'][...] = 0
+        self.planes['apple'][...] = 0
+        self.set_cell('head', self.snake.get_head(), 1)
+        self.set_cell('apple', self.apple.location, 1)
+        self.update_features()
+        return self.observation, self.info()
+
+    def set_cell(self, plane: str, node: tuple, value: int):
+        if self.snake.board.is_inside(node):
+            x, y = node
+            self.planes[plane][y, x] = value
+
+    def update_features(self):
+        if 'apple_distance' in self.features:
+            plane = self.planes['apple_distance']
+            if not self.is_completed() and self.snake.board.is_inside(self.apple.location):
+                field = DistanceField(board=self.snake.board, source=self.apple.location)
+                plane.reshape(-1)[:] = field.distances
+            else:
+                plane[:] = -1
+
+    def info(self):
+        return {'score': self.snake.score, 'steps': self.steps, 'length': len(self.snake.body)}
+
+    def is_completed(self):
+        return len(self.snake.body) >= self.cell_width * self.cell_height
+
+    def step(self, action: int):
+        """
+        :param action: index into DIRECTIONS
+        :return: (observation, reward, terminated, truncated, info). The reward is 1 for eating an apple, -1 for dying
+        and 0 otherwise. A game is terminated when the snake dies or fills the board
+        """
+        if self.snake is None or self.snake.is_dead or self.is_completed():
+            raise RuntimeError('The game is over, call reset() to start a new one')
+
+        head = self.snake.get_head()
+        tail = self.snake.body[0]
+        apple_location = self.apple.location
+        self.snake.move(new_head=self.node_add(head, DIRECTIONS[action]), apple=self.apple)
+        self.steps += 1
+        self.idle_steps += 1
+
+        reward = 0
+        if self.snake.is_dead:
+            reward = -1
+        else:
+            board = self.snake.board
+            for node in (tail, self.snake.get_head()):
+                self.set_cell('body', node, board.cells[board.index(node)])
+            self.set_cell('head', head, 0)
+            self.set_cell('head', self.snake.get_head(), 1)
+            if self.snake.eaten:
+                reward = 1
+                self.idle_steps = 0
+                self.set_cell('apple', apple_location, 0)
+                if not self.is_completed():
+                    self.apple.refresh(snake=self.snake)
+                    self.set_cell('apple', self.apple.location, 1)
+            self.update_features()
+
+        terminated = self.snake.is_dead or self.is_completed()
+        truncated = not terminated and self.max_idle_steps is not None and self.idle_steps >= self.max_idle_steps
+        return self.observation, reward, terminated, truncated, self.info()
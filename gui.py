@@ -0,0 +1,230 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import contextlib
+import sys
+import time
+from dataclasses import dataclass
+from functools import partial
+from itertools import count
+
+from anytime import Anytime
+from model import Apple, Base, Snake
+from players import Mixed, Player, register_solver
+from simulator import Simulator
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+DARKGRAY = (40, 40, 40)
+
+# Imported by load_pygame, on first use of the GUI
+pygame = None
+
+
+def load_pygame():
+    """
+    Import pygame on first use only: importing it initializes SDL, which the game model, the solvers and the
+    simulator never need
+    """
+    global pygame
+    if pygame is None:
+        with contextlib.redirect_stdout(None):
+            import pygame as module
+        pygame = module
+    return pygame
+
+
+@register_solver('human')
+class Human(Player):
+    headless = False
+
+    def __init__(self, snake: Snake, apple: Apple, **kwargs):
+        """
+        :param snake: Snake instance
+        :param apple: Apple instance
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        load_pygame()
+
+    def next_node(self):
+        return self.run()
+
+    def run(self):
+        for event in pygame.event.get():  # event handling loop
+            if event.type == pygame.KEYDOWN:
+                if (event.key == pygame.K_LEFT or event.key == pygame.K_a) and self.snake.last_direction != (1, 0):
+                    diff = (-1, 0)  # left
+                elif (event.key == pygame.K_RIGHT or event.key == pygame.K_d) and self.snake.last_direction != (-1, 0):
+                    diff = (1, 0)  # right
+                elif (event.key == pygame.K_UP or event.key == pygame.K_w) and self.snake.last_direction != (0, 1):
+                    diff = (0, -1)  # up
+                elif (event.key == pygame.K_DOWN or event.key == pygame.K_s) and self.snake.last_direction != (0, -1):
+                    diff = (0, 1)  # down
+                else:
+                    break
+                return self.node_add(self.snake.get_head(), diff)
+        # If no button is pressed down, follow previou direction
+        return self.node_add(self.snake.get_head(), self.snake.last_direction)
+
+
+@dataclass
+class SnakeGame(Base):
+    fps: int = 60
+
+    def __init__(
+        self,
+        player_class=Mixed,
+        fps: int = 60,
+        seed: int = None,
+        max_idle_steps: int = None,
+        anytime: bool = False,
+        **kwargs
+    ):
+        """
+        :param player_class: a Player subclass deciding the moves, see players.SOLVERS
+        :param fps: moves per second, 0 for as fast as the solver goes
+        :param seed: Optional. Seed of the apple locations of the first game, the next games get the next seeds
+        :param max_idle_steps: Optional. Stop a game after this many steps without eating an apple
+        :param anytime: if True, the solver decides every move within a frame, see anytime.Anytime, so that long
+        searches do not stall the game. A human player always moves at once
+        """
+        super().__init__(**kwargs)
+        self.player_class = player_class
+        if anytime and player_class is not Human:
+            self.player_class = partial(Anytime, solver=player_class, deadline=1 / fps if fps else None)
+        self.fps = fps
+        self.seed = seed
+        self.max_idle_steps = max_idle_steps
+        self.kwargs = kwargs
+
+        load_pygame()
+        pygame.init()
+        self.clock = pygame.time.Clock()
+        self.display = pygame.display.set_mode((self.window_width, self.window_height))
+        pygame.display.set_caption('Perfect Snake')
+        # The grid is drawn once, frames only repaint the cells which changed on top of it
+        self.background = pygame.Surface((self.window_width, self.window_height))
+        self.draw_panel(self.background)
+
+    def launch(self, games: int = None):
+        """
+        :param games: Optional. Quit after this many games, instead of waiting for a key to start the next one
+        """
+        for played in count(1):
+            self.game(number=played - 1)
+            if games is not None and played >= games:
+                break
+            self.pause_game()
+
+    def game(self, number: int = 0):
+        """
+        :param number: number of the game since launch, game n is played with seed + n
+        """
+        seed = self.seed + number if self.seed is not None else None
+        simulator = Simulator(
+            player_class=self.player_class, seed=seed, max_idle_steps=self.max_idle_steps, **self.kwargs
+        )
+        simulator.reset()
+        self.draw_frame(simulator.snake, simulator.apple.location)
+
+        while not simulator.is_over():
+            # A human player reads the key events itself
+            events = pygame.event.get(pygame.QUIT) if self.player_class is Human else pygame.event.get()
+            for event in events:  # event handling loop
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    self.terminate()
+
+            # A move changes the cells of the old and new head, the old and new tail and the old and new apple
+            changed = {simulator.snake.get_head(), simulator.snake.body[0], simulator.apple.location}
+            simulator.step()
+
+            if simulator.snake.is_dead:
+                print("Dead")
+                break
+
+            changed.update((simulator.snake.get_head(), simulator.snake.body[0], simulator.apple.location))
+            pygame.display.update(
+                [self.draw_cell(node, simulator.snake, simulator.apple.location) for node in changed]
+            )
+            self.clock.tick(self.fps)
+
+        simulator.player.close()
+        print(f"Score: {simulator.snake.score}")
+        print(f"Mean step time: {round(simulator.metrics.histograms['decision'].mean() / 1e9, 4)}")
+
+    @staticmethod
+    def terminate():
+        pygame.quit()
+        sys.exit()
+
+    def pause_game(self):
+        while True:
+            time.sleep(0.2)
+            for event in pygame.event.get():  # event handling loop
+                if event.type == pygame.QUIT:
+                    self.terminate()
+                if event.type == pygame.KEYUP:
+                    if event.key == pygame.K_ESCAPE:
+                        self.terminate()
+                    else:
+                        return
+
+    def draw_frame(self, snake: Snake, apple_location: tuple):
+        """
+        Draw the whole window, at the start of a game
+        """
+        self.display.blit(self.background, (0, 0))
+        self.draw_snake(snake.body)
+        self.draw_apple(apple_location)
+        pygame.display.update()
+
+    def draw_cell(self, node: tuple, snake: Snake, apple_location: tuple):
+        """
+        Repaint one cell over the background, with what the snake and the apple put on it
+        :return: the rect of the cell, to update on the display
+        """
+        x, y = node[0] * self.cell_size, node[1] * self.cell_size
+        cell = pygame.Rect(x, y, self.cell_size, self.cell_size)
+        self.display.blit(self.background, cell, cell)
+
+        if node == apple_location:
+            pygame.draw.rect(self.display, RED, cell)
+        elif snake.board.is_inside(node) and snake.board.is_occupied(node):
+            # The tail is drawn over the head, as in draw_snake
+            color = BLUE if node == snake.body[0] else GREEN if node == snake.get_head() else WHITE
+            pygame.draw.rect(self.display, color, pygame.Rect(x, y, self.cell_size - 1, self.cell_size - 1))
+        return cell
+
+    def draw_snake(self, snake_body):
+        for snake_block_x, snake_block_y in snake_body:
+            x = snake_block_x * self.cell_size
+            y = snake_block_y * self.cell_size
+            snake_block = pygame.Rect(x, y, self.cell_size - 1, self.cell_size - 1)
+            pygame.draw.rect(self.display, WHITE, snake_block)
+
+        # Draw snake's head
+        x = snake_body[-1][0] * self.cell_size
+        y = snake_body[-1][1] * self.cell_size
+        snake_block = pygame.Rect(x, y, self.cell_size - 1, self.cell_size - 1)
+        pygame.draw.rect(self.display, GREEN, snake_block)
+
+        # Draw snake's tail
+        x = snake_body[0][0] * self.cell_size
+        y = snake_body[0][1] * self.cell_size
+        snake_block = pygame.Rect(x, y, self.cell_size - 1, self.cell_size - 1)
+        pygame.draw.rect(self.display, BLUE, snake_block)
+
+    def draw_apple(self, apple_location):
+        apple_x, apple_y = apple_location
+        apple_block = pygame.Rect(apple_x * self.cell_size, apple_y * self.cell_size, self.cell_size, self.cell_size)
+        pygame.draw.rect(self.display, RED, apple_block)
+
+    def draw_panel(self, surface):
+        surface.fill(BLACK)
+        for x in range(0, self.window_width, self.cell_size):  # draw vertical lines
+            pygame.draw.line(surface, DARKGRAY, (x, 0), (x, self.window_height))
+        for y in range(0, self.window_height, self.cell_size):  # draw horizontal lines
+            pygame.draw.line(surface, DARKGRAY, (0, y), (self.window_width, y))
@@ -0,0 +1,163 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import cProfile
+import json
+import pstats
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Every power of two is split into 2 ** SUB_BUCKET_BITS buckets, i.e. latencies are kept within 12.5%
+SUB_BUCKET_BITS = 3
+
+
+class LatencyHistogram:
+    def __init__(self):
+        """
+        Latencies in nanoseconds, counted in log-scaled buckets so that memory stays bounded whatever the number of
+        samples
+        """
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(nanoseconds: int):
+        """
+        :return: the lower bound of the bucket of a latency
+        """
+        shift = max(nanoseconds.bit_length() - 1 - SUB_BUCKET_BITS, 0)
+        return (nanoseconds >> shift) << shift
+
+    def record(self, nanoseconds: int):
+        self.buckets[self.bucket(nanoseconds)] += 1
+        self.count += 1
+        self.total += nanoseconds
+        self.max = max(self.max, nanoseconds)
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float):
+        """
+        Nearest-rank percentile, as the lower bound of its bucket. The 100th percentile is the exact maximum
+        """
+        if not self.count:
+            return None
+        rank = max(int(round(percent / 100 * self.count)), 1)
+        if rank >= self.count:
+            return self.max
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return bucket
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ns': round(self.mean()) if self.count else None,
+            'p50_ns': self.percentile(50),
+            'p95_ns': self.percentile(95),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max if self.count else None,
+        }
+
+
+class Metrics:
+    def __init__(self, profile: bool = False):
+        """
+        Counters and latency histograms of a run, e.g. nodes expanded or searches run by the solvers
+        :param profile: if True, keep a cProfile profile of the code run under Metrics.profiling()
+        """
+        self.counters = Counter()
+        self.histograms = {}
+        # Latency histograms per group, e.g. the snake's length when they were recorded
+        self.groups = {}
+        self.group = None
+        self.profiler = cProfile.Profile() if profile else None
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    @staticmethod
+    def histogram(histograms: dict, name: str):
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = LatencyHistogram()
+        return histogram
+
+    def record(self, name: str, nanoseconds: int):
+        self.histogram(self.histograms, name).record(nanoseconds)
+        if self.group is not None:
+            group = self.groups.get(self.group)
+            if group is None:
+                group = self.groups[self.group] = {}
+            self.histogram(group, name).record(nanoseconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - start)
+
+    @contextmanager
+    def profiling(self):
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    def merge(self, other):
+        self.counters.update(other.counters)
+        for name, histogram in other.histograms.items():
+            self.histogram(self.histograms, name).merge(histogram)
+        for group, histograms in other.groups.items():
+            for name, histogram in histograms.items():
+                self.histogram(self.groups.setdefault(group, {}), name).merge(histogram)
+
+    def profile_stats(self, limit: int = 20):
+        """
+        :return: the functions with the largest cumulative time in the profile
+        """
+        if self.profiler is None:
+            return None
+        stats = pstats.Stats(self.profiler).stats
+        functions = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [{
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'total_s': round(total_time, 6),
+            'cumulative_s': round(cumulative_time, 6),
+        } for (filename, line, name), (_, calls, total_time, cumulative_time, _) in functions]
+
+    def to_dict(self):
+        report = {
+            'counters': dict(self.counters),
+            'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+            'groups': {
+                group: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                for group, histograms in self.groups.items()
+            },
+        }
+        if self.profiler is not None:
+            report['profile'] = self.profile_stats()
+        return report
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
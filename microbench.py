@@ -0,0 +1,225 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import argparse
+import csv
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from itertools import product
+
+from benchmark import parse_size
+from metrics import Metrics
+from model import DIRECTIONS, Apple, Snake
+from players import Astar, BFS, DistanceField, LongestPath, Mixed, TranspositionTable
+
+SIZES = [(12, 12), (50, 50), (100, 100), (200, 200)]
+FILLS = [0.1, 0.5, 0.9]
+RESULT_FIELDS = [
+    'primitive', 'width', 'height', 'fill', 'calls', 'min_ns', 'median_ns', 'nodes_expanded', 'allocated_blocks',
+    'peak_bytes'
+]
+
+
+def fixture(width: int, height: int, fill: float, seed: int = 0):
+    """
+    A reproducible board: the snake covers the first cells of the board row after row, going back and forth, with its
+    tail at (0, 0), and the apple is on a seeded random free cell
+    :param fill: part of the board covered by the snake, at least 2 cells
+    :return: (snake, apple)
+    """
+    length = max(2, min(int(width * height * fill), width * height - 1))
+    zigzag = [(x if y % 2 == 0 else width - 1 - x, y) for y in range(height) for x in range(width)]
+    snake = Snake(body=zigzag[:length], cell_width=width, cell_height=height)
+    apple = Apple(seed=seed, cell_width=width, cell_height=height)
+    apple.refresh(snake=snake)
+    return snake, apple
+
+
+def primitives(snake: Snake, apple: Apple, metrics: Metrics):
+    """
+    The search primitives of the solvers, on one board. Searches which keep their results in a transposition table get
+    an empty one on every call, so that every call searches
+    :return: dict of name: function making one call
+    """
+    kwargs = dict(metrics=metrics, cell_width=snake.cell_width, cell_height=snake.cell_height)
+    bfs = BFS(snake=snake, apple=apple, **kwargs)
+    longest = LongestPath(snake=snake, apple=apple, **kwargs)
+    mixed = Mixed(snake=snake, apple=apple, **kwargs)
+    astar = Astar(snake=snake, apple=apple, **kwargs)
+    # Refreshing moves the apple, the other primitives keep theirs
+    refreshed = Apple(seed=0, cell_width=snake.cell_width, cell_height=snake.cell_height)
+    # The free cell index is built on first use, not on the timed calls
+    snake.free_cells
+    head = snake.get_head()
+    neighbors = [(head[0] + dx, head[1] + dy) for dx, dy in DIRECTIONS]
+
+    def run_longest():
+        longest.transpositions = TranspositionTable()
+        return longest.run_longest()
+
+    def escape():
+        mixed.transpositions = TranspositionTable()
+        return mixed.run_escape()
+
+    def dead_checking():
+        for node in neighbors:
+            snake.dead_checking(head=node, check=True)
+
+    return {
+        'bfs': bfs.search,
+        'longest': run_longest,
+        'escape': escape,
+        'astar': astar.run_astar,
+        'distance_field': lambda: DistanceField(board=snake.board, source=head, metrics=metrics),
+        'apple_refresh': lambda: refreshed.refresh(snake=snake),
+        'dead_checking': dead_checking,
+    }
+
+
+def traced(function):
+    """
+    Trace the memory allocated by one call of function with tracemalloc, which counts every allocation, including the
+    lists, deques and paths built by the searches
+    :return: (memory blocks still allocated when the call returns, its result included, most bytes allocated at once
+    during the call)
+    """
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+    del result
+    return blocks, peak
+
+
+def measure(function, repeat: int = 5, min_time: float = 0.005):
+    """
+    Time function like timeit: the number of calls per run is doubled until a run takes min_time seconds
+    :return: (calls per run, list of nanoseconds per call, one per run)
+    """
+    calls = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            function()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            break
+        calls *= 2
+
+    times = [elapsed / calls]
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            function()
+        times.append((time.perf_counter_ns() - start) / calls)
+    return calls, times
+
+
+def run_suite(sizes=SIZES, fills=FILLS, names=None, repeat: int = 5, min_time: float = 0.005):
+    """
+    Time every primitive on every board
+    :param sizes: list of (width, height)
+    :param fills: parts of the board covered by the snake
+    :param names: Optional. Primitives to time, defaults to all of them
+    :return: list of dicts with RESULT_FIELDS. Nodes expanded, allocated blocks and peak bytes are the ones of one
+    call, after a first call which builds what is cached between calls
+    """
+    results = []
+    for (width, height), fill in product(sizes, fills):
+        snake, apple = fixture(width, height, fill)
+        metrics = Metrics()
+        for name, function in primitives(snake, apple, metrics).items():
+            if names is not None and name not in names:
+                continue
+            function()
+            metrics.counters.clear()
+            blocks, peak = traced(function)
+            counters = dict(metrics.counters)
+            calls, times = measure(function, repeat=repeat, min_time=min_time)
+            results.append({
+                'primitive': name,
+                'width': width,
+                'height': height,
+                'fill': fill,
+                'calls': calls,
+                'min_ns': round(min(times)),
+                'median_ns': round(statistics.median(times)),
+                'nodes_expanded': sum(value for key, value in counters.items() if key.endswith('.nodes_expanded')),
+                'allocated_blocks': blocks,
+                'peak_bytes': peak,
+            })
+    return results
+
+
+def compare(results, baseline, threshold: float = 0.25):
+    """
+    :param baseline: results of an earlier run_suite, e.g. before a change
+    :param threshold: a primitive regresses when its median time grows by more than this part of the baseline one.
+    Nodes expanded, allocated blocks and peak bytes do not depend on the machine, any growth is a regression
+    :return: list of messages, one per regression. Primitives missing from the baseline are skipped
+    """
+    def key(row):
+        return row['primitive'], row['width'], row['height'], row['fill']
+
+    baseline = {key(row): row for row in baseline}
+    regressions = []
+    for row in results:
+        before = baseline.get(key(row))
+        if before is None:
+            continue
+        name = '{} {}x{} {:.0%}'.format(*key(row))
+        if row['median_ns'] > before['median_ns'] * (1 + threshold):
+            regressions.append(f"{name}: median {before['median_ns']} ns -> {row['median_ns']} ns")
+        for counter in ('nodes_expanded', 'allocated_blocks', 'peak_bytes'):
+            if row[counter] > before[counter]:
+                regressions.append(f"{name}: {counter} {before[counter]} -> {row[counter]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the search primitives of the solvers across board sizes')
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=SIZES, help='e.g. 12x12 200x200')
+    parser.add_argument('--fills', nargs='+', type=float, default=FILLS, help='parts of the board covered by the snake')
+    parser.add_argument('--primitives', nargs='+', help='primitives to time, defaults to all of them')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs per primitive')
+    parser.add_argument('--min-time', type=float, default=0.005, help='minimum seconds of a timed run')
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--output', help='file to write the report to, defaults to stdout')
+    parser.add_argument('--baseline', help='JSON report of an earlier run, fail on regressions against it')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed growth of the median time')
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        sizes=args.sizes, fills=args.fills, names=args.primitives, repeat=args.repeat, min_time=args.min_time
+    )
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            json.dump({'results': results}, output, indent=2)
+            output.write('\n')
+    finally:
+        if args.output:
+            output.close()
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline)['results'], threshold=args.threshold)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import random
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+
+@dataclass
+class Base:
+    cell_size: int = 20
+    cell_width: int = 12
+    cell_height: int = 12
+
+    @property
+    def window_width(self):
+        return self.cell_size * self.cell_width
+
+    @property
+    def window_height(self):
+        return self.cell_size * self.cell_height
+
+    @staticmethod
+    def node_add(node_a: Tuple[int, int], node_b: Tuple[int, int]):
+        result: Tuple[int, int] = (node_a[0] + node_b[0], node_a[1] + node_b[1])
+        return result
+
+    @staticmethod
+    def node_sub(node_a: Tuple[int, int], node_b: Tuple[int, int]):
+        result: Tuple[int, int] = (node_a[0] - node_b[0], node_a[1] - node_b[1])
+        return result
+
+
+# The moves of a snake as (x, y) differences: down, up, right, left. Neighbour tables, solvers, replays and the
+# environments all list the moves in this order, an action or a recorded move being an index into it
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+@lru_cache(maxsize=None)
+def cell_tables(cell_width: int, cell_height: int):
+    """
+    Cells are numbered row by row, see Board.index. Computed once per board size, so that searches step from cell
+    index to cell index without building tuples or checking the bounds. The body, plans and moves stay (x, y) tuples:
+    they are what players, replays and environments exchange, and only change by a node or two per step
+    :return: (nodes, neighbors). nodes[index] is the (x, y) of the cell, neighbors[index] the indices of the cells next
+    to it inside the board, in the order of DIRECTIONS
+    """
+    nodes = tuple((index % cell_width, index // cell_width) for index in range(cell_width * cell_height))
+    neighbors = tuple(
+        tuple(
+            (y + dy) * cell_width + x + dx
+            for dx, dy in DIRECTIONS
+            if 0 <= x + dx < cell_width and 0 <= y + dy < cell_height
+        )
+        for x, y in nodes
+    )
+    return nodes, neighbors
+
+
+# Translation of the cells of a board into the binary digits of Board.bits: '1' for an occupied cell
+BIT_DIGITS = b'0' + b'1' * 255
+
+
+class Board(Base):
+    def __init__(self, body: iter = (), cells: bytearray = None, bits: int = None, **kwargs):
+        """
+        Occupancy grid of the game area, one byte per cell counting the body nodes on it
+        :param body: Optional. Nodes to occupy
+        :param cells: Optional. An existing grid to copy
+        :param bits: Optional. The bits of cells, see Board.bits
+        """
+        super().__init__(**kwargs)
+        self.cells = bytearray(cells) if cells else bytearray(self.cell_width * self.cell_height)
+        self.nodes, self.neighbors = cell_tables(self.cell_width, self.cell_height)
+        # Built on first use, see Board.bits: many boards, e.g. the ones of virtual snakes, never need them
+        self._bits = bits
+        for node in body:
+            self.occupy(node)
+
+    @property
+    def bits(self):
+        """
+        Bit Board.index(node) is set when node is occupied, for the bitboard flood fills of bitboard.py. Built at once
+        from the cells on first use, then kept up to date as cells are occupied and released
+        """
+        if self._bits is None:
+            self._bits = int(self.cells[::-1].translate(BIT_DIGITS), 2)
+        return self._bits
+
+    def copy(self):
+        return Board(
+            cells=self.cells,
+            bits=self._bits,
+            cell_size=self.cell_size,
+            cell_width=self.cell_width,
+            cell_height=self.cell_height
+        )
+
+    def index(self, node: tuple):
+        x, y = node
+        return y * self.cell_width + x
+
+    def node(self, index: int):
+        return self.nodes[index]
+
+    def is_inside(self, node: tuple):
+        x, y = node
+        return 0 <= x < self.cell_width and 0 <= y < self.cell_height
+
+    def is_occupied(self, node: tuple):
+        """
+        :param node: a node inside the game area
+        """
+        return self.cells[self.index(node)] != 0
+
+    def is_free(self, node: tuple):
+        return self.is_inside(node) and not self.is_occupied(node)
+
+    def occupy(self, node: tuple):
+        index = self.index(node)
+        self.cells[index] += 1
+        if self._bits is not None:
+            self._bits |= 1 << index
+
+    def release(self, node: tuple):
+        index = self.index(node)
+        self.cells[index] -= 1
+        if not self.cells[index] and self._bits is not None:
+            self._bits &= ~(1 << index)
+
+
+class FreeCells:
+    def __init__(self, board: Board):
+        """
+        Index of the free cells of a board: an array of cell indices plus the position of every cell in the array, so
+        that adding, removing (swapping with the last one) and sampling a cell are O(1)
+        :param board: Board instance
+        """
+        self.cells = [index for index, count in enumerate(board.cells) if not count]
+        self.positions = [-1] * len(board.cells)
+        for position, index in enumerate(self.cells):
+            self.positions[index] = position
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, index: int):
+        return self.positions[index] != -1
+
+    def add(self, index: int):
+        self.positions[index] = len(self.cells)
+        self.cells.append(index)
+
+    def remove(self, index: int):
+        position = self.positions[index]
+        last = self.cells.pop()
+        if last != index:
+            self.cells[position] = last
+            self.positions[last] = position
+        self.positions[index] = -1
+
+    def sample(self, rng: random.Random):
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class Apple(Base):
+    def __init__(self, seed: int = None, **kwargs):
+        """
+        :param seed: Optional. Seed of the apple locations, for reproducible games
+        """
+        super().__init__(**kwargs)
+        self.location = None
+        self.random = random.Random(seed)
+
+    def refresh(self, snake):
+        """
+        Generate a new apple
+        """
+        # If there's no available node for new apple, it reaches the perfect solution. Don't draw the apple then.
+        if snake.free_cells:
+            location = snake.board.node(snake.free_cells.sample(self.random))
+        else:
+            location = (-1, -1)
+
+        self.location = location
+
+
+class Snake(Base):
+    def __init__(self, initial_length: int = 3, body: list = None, **kwargs):
+        """
+        :param initial_length: The initial length of the snake
+        :param body: Optional. Specifying an initial snake body
+        """
+        super().__init__(**kwargs)
+        self.initial_length = initial_length
+        self.score = 0
+        self.is_dead = False
+        self.eaten = False
+
+        # last_direction is only used for human player, giving it a default direction when game starts
+        self.last_direction = (-1, 0)
+
+        if body:
+            self.body = deque(body)
+        else:
+            if not 0 < initial_length < self.cell_width:
+                raise ValueError(f"Initial_length should fall in (0, {self.cell_width})")
+
+            start_x = self.cell_width // 2
+            start_y = self.cell_height // 2
+
+            start_body_x = [start_x] * initial_length
+            start_body_y = range(start_y, start_y - initial_length, -1)
+
+            self.body = deque(zip(start_body_x, start_body_y))
+
+        self.board = Board(
+            body=self.body, cell_size=self.cell_size, cell_width=self.cell_width, cell_height=self.cell_height
+        )
+        # Built on first use, virtual snakes of the solvers never need it
+        self._free_cells = None
+
+    @property
+    def free_cells(self):
+        """
+        FreeCells of the snake's board, kept up to date as the snake moves
+        """
+        if self._free_cells is None:
+            self._free_cells = FreeCells(board=self.board)
+        return self._free_cells
+
+    def get_head(self):
+        return self.body[-1]
+
+    def expiry(self):
+        """
+        For every cell, the number of steps after which the body has left it if the snake does not eat, 0 for free
+        cells. The tail leaves after one step, the head after len(body) steps
+        :return: list indexed by Board.index
+        """
+        expiry = [0] * len(self.board.cells)
+        for step, node in enumerate(self.body, 1):
+            expiry[self.board.index(node)] = step
+        return expiry
+
+    def dead_checking(self, head, check=False):
+        """
+        Check if the snake is dead
+        :param check: if check is True, only return the checking result without updating snake.is_dead
+        :return: Boolean
+        """
+        # The tail is not an obstacle, it moves forward together with the head
+        if not self.board.is_inside(head) or (self.board.is_occupied(head) and head != self.body[0]):
+            if not check:
+                self.is_dead = True
+            return True
+        return False
+
+    def cut_tail(self):
+        tail = self.body.popleft()
+        self.board.release(tail)
+        if self._free_cells is not None and not self.board.is_occupied(tail):
+            self._free_cells.add(self.board.index(tail))
+
+    def move(self, new_head: tuple, apple: Apple):
+        """
+        Given the location of apple, decide if the apple is eaten (same location as the snake's head)
+        :param new_head: (new_head_x, new_head_y)
+        :param apple: Apple instance
+        :return: Boolean. Whether the apple is eaten.
+        """
+        if new_head is None:
+            self.is_dead = True
+            return
+
+        if self.dead_checking(head=new_head):
+            return
+
+        self.last_direction = self.node_sub(new_head, self.get_head())
+
+        # make the move
+        self.body.append(new_head)
+        self.board.occupy(new_head)
+        if self._free_cells is not None and self.board.index(new_head) in self._free_cells:
+            self._free_cells.remove(self.board.index(new_head))
+
+        # if the snake eats the apple, score adds 1
+        if self.get_head() == apple.location:
+            self.eaten = True
+            self.score += 1
+        # Otherwise, cut the tail so that snake moves forward without growing
+        else:
+            self.eaten = False
+            self.cut_tail()
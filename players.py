@@ -0,0 +1,849 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+from collections import OrderedDict, deque
+from functools import lru_cache
+from heapq import heappop, heappush
+from itertools import count, islice
+
+from bitboard import Bitboard
+from metrics import Metrics
+from model import Apple, Base, Board, Snake
+
+
+# Player implementations by name, see solvers.py for the complete list
+SOLVERS = {}
+
+
+def register_solver(name: str):
+    """
+    Class decorator adding a Player implementation to SOLVERS
+    """
+    def register(player_class):
+        SOLVERS[name] = player_class
+        return player_class
+
+    return register
+
+
+def manhattan(start, goal):
+    return abs(start[0] - goal[0]) + abs(start[1] - goal[1])
+
+
+def tail_tie_breaking(snake):
+    """
+    Build an A* heuristic which, among paths of the same length, prefers the ones staying close to the snake's tail
+    :param snake: Snake instance
+    """
+    tail = snake.body[0]
+    # Small enough that the tail term never outweighs one step
+    weight = 1 / (snake.cell_width + snake.cell_height)
+
+    def heuristic(node, goal):
+        return manhattan(node, goal) + weight * manhattan(node, tail)
+
+    return heuristic
+
+
+def cell_path(board: Board, parents: list, start: int, goal: int):
+    """
+    :param parents: the index of the cell each cell was reached from, indexed by Board.index
+    :return: the full path of nodes from start to goal, both cell indices
+    """
+    nodes = board.nodes
+    path = [nodes[goal]]
+    while goal != start:
+        goal = parents[goal]
+        path.append(nodes[goal])
+    path.reverse()
+    return path
+
+
+class DistanceField:
+    def __init__(self, board: Board, source: tuple, metrics: Metrics = None):
+        """
+        Flood fill the free cells of a board from a source, keeping the distance and the parent of every cell, so that
+        the distance or the path from the source to any cell is a lookup
+        :param board: Board instance, occupied cells are obstacles
+        :param source: (source_x, source_y). The source itself may be occupied, e.g. a snake's head
+        :param metrics: Optional. Metrics counting the search and the nodes it expands
+        """
+        self.board = board
+        self.source = source
+        # Indexed by Board.index, parents holds the index of the cell each cell was reached from
+        self.distances = distances = [-1] * len(board.cells)
+        self.parents = parents = [-1] * len(board.cells)
+
+        cells = board.cells
+        neighbors = board.neighbors
+        start = board.index(source)
+        distances[start] = 0
+        queue = deque([start])
+        expanded = 0
+        while queue:
+            index = queue.popleft()
+            expanded += 1
+            distance = distances[index] + 1
+            for next_index in neighbors[index]:
+                if distances[next_index] != -1 or cells[next_index]:
+                    continue
+                distances[next_index] = distance
+                parents[next_index] = index
+                queue.append(next_index)
+
+        if metrics is not None:
+            metrics.count('distance_field.searches')
+            metrics.count('distance_field.nodes_expanded', expanded)
+
+    def distance(self, node: tuple):
+        """
+        :return: the number of steps from the source to node, or None if node is not reachable
+        """
+        if not self.board.is_inside(node) or self.distances[self.board.index(node)] == -1:
+            return None
+        return self.distances[self.board.index(node)]
+
+    def is_reachable(self, node: tuple):
+        return self.distance(node) is not None
+
+    def path_to(self, node: tuple):
+        """
+        :return: the full path from the source to node, or None if node is not reachable
+        """
+        if not self.is_reachable(node):
+            return None
+        return cell_path(self.board, self.parents, self.board.index(self.source), self.board.index(node))
+
+
+class PlanCache:
+    def __init__(self):
+        """
+        Path planned for the current apple, followed step by step instead of planning again every move
+        """
+        self.path = deque()
+        self.apple_location = None
+        self.head = None
+
+    def store(self, path: list, apple: Apple):
+        """
+        :param path: full path from snake's head
+        :param apple: Apple instance the path was planned for
+        """
+        self.head = path[0]
+        self.path = deque(path[1:])
+        self.apple_location = apple.location
+
+    def clear(self):
+        self.path.clear()
+
+    def next_node(self, snake: Snake, apple: Apple):
+        """
+        Between two steps only the head and the tail of the snake change, and the path was planned for the whole body
+        moving along it. So the plan is still valid if the apple did not change, the snake made the planned move, and
+        the next node is not blocked
+        :return: the next node of the plan, or None if there is no valid plan
+        """
+        if not self.path or apple.location != self.apple_location or snake.get_head() != self.head:
+            self.clear()
+            return None
+
+        node = self.path[0]
+        if snake.dead_checking(head=node, check=True):
+            self.clear()
+            return None
+
+        self.head = self.path.popleft()
+        return node
+
+
+# Missing entries of TranspositionTable, None being a valid search result
+MISSING = object()
+
+
+class TranspositionTable:
+    def __init__(self, maxsize: int = 4096):
+        """
+        Bounded cache of search results, keyed on the board state they were computed for, e.g. the occupied cells, the
+        head and the target. Recurring states, like a snake circling while it escapes, are answered without searching
+        again, and any change of the state is a new key, so entries never need to be invalidated. The least recently
+        used entries are evicted first
+        :param maxsize: maximum number of entries
+        """
+        self.entries = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        :return: the value stored for key, or MISSING
+        """
+        value = self.entries.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+class Player(Base):
+    # Whether the player decides without a window, so that it can play in the benchmark workers and the server
+    headless = True
+
+    def __init__(
+        self,
+        snake: Snake,
+        apple: Apple,
+        metrics: Metrics = None,
+        transpositions: TranspositionTable = None,
+        **kwargs
+    ):
+        """
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param metrics: Optional. Metrics of the searches and stages of the solver, shared with its sub-solvers
+        :param transpositions: Optional. TranspositionTable of the search results, shared with its sub-solvers
+        """
+        super().__init__(**kwargs)
+        self.snake = snake
+        self.apple = apple
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.transpositions = transpositions if transpositions is not None else TranspositionTable()
+        self.kwargs = kwargs
+        self.bitboard = Bitboard(
+            cell_size=snake.cell_size, cell_width=snake.cell_width, cell_height=snake.cell_height
+        )
+        # The best move found so far by the decision being made, for a player cut short by a deadline, see
+        # anytime.Anytime. Solvers set it as their search goes, None until they have one. Work done only to find a
+        # candidate is skipped unless publish_candidate is set, by the caller reading it
+        self.candidate = None
+        self.publish_candidate = False
+
+    def next_node(self):
+        """
+        Decide the next move of the snake. Every solver implements this, so that a game loop can drive any player
+        :return: (new_head_x, new_head_y), or None if there is no move
+        """
+        raise NotImplementedError
+
+    def observe(self, snake: Snake, apple: Apple):
+        """
+        Decide the next moves for other Snake and Apple instances, e.g. copies of the game made for another thread.
+        What the solver keeps between moves, like its plan, stays valid if they continue the same game
+        """
+        self.snake = snake
+        self.apple = apple
+
+    def close(self):
+        """
+        Release what the solver holds between moves, e.g. threads. Called once the game is over
+        """
+
+    @property
+    def sub_solver_kwargs(self):
+        """
+        Arguments of the solvers run by this one, sharing its metrics and its transposition table
+        """
+        return dict(self.kwargs, metrics=self.metrics, transpositions=self.transpositions)
+
+    def transposition(self, key: tuple, search):
+        """
+        :param key: the state the search depends on, see TranspositionTable
+        :param search: function computing the result when it is not in the table
+        """
+        value = self.transpositions.get(key)
+        if value is MISSING:
+            self.metrics.count('transpositions.misses')
+            value = search()
+            self.transpositions.put(key, value)
+        else:
+            self.metrics.count('transpositions.hits')
+        return value
+
+    def is_virtual_tail_reachable(self, path: list):
+        """
+        Whether a virtual snake sent along a path from snake's head, until it eats the apple at the end of the path,
+        has a way to its tail, the tail moving forward together with the head. Checked with a bitboard flood fill on the
+        occupied cells, which only change along the path, and kept in the transposition table
+        :param path: full path from snake's head to apple. It may go through body nodes the tail has left by then, see
+        BFS time_aware
+        """
+        bit = self.bitboard.bit
+        body = self.snake.body
+        # The virtual snake is the last len(body) + 1 nodes of the body followed by the path, as it grows by one node:
+        # the first len(path) - 2 of them are left behind
+        left = len(path) - 2
+        if left < len(body):
+            # The body nodes left behind are released before the path is occupied, as the path may go through them
+            occupied = self.snake.board.bits
+            for node in islice(body, left):
+                occupied &= ~bit(node)
+            for node in path[1:]:
+                occupied |= bit(node)
+            tail = body[left]
+        else:
+            # The whole body is left behind, and so are the first nodes of the path
+            occupied = 0
+            for node in path[left - len(body) + 1:]:
+                occupied |= bit(node)
+            tail = path[left - len(body) + 1]
+
+        def search():
+            self.metrics.count('bitboard.floods')
+            tail_bit = bit(tail)
+            region = self.bitboard.flood(bit(path[-1]), self.bitboard.full & ~occupied | tail_bit, target=tail_bit)
+            return region & tail_bit != 0
+
+        return self.transposition(('tail', occupied, path[-1], tail), search)
+
+    def _get_neighbors(self, node):
+        """
+        fetch the neighbours of a node inside the game area, see model.cell_tables
+        :param node: (node_x, node_y)
+        """
+        board = self.snake.board
+        nodes = board.nodes
+        return [nodes[index] for index in board.neighbors[board.index(node)]]
+
+    def is_invalid_move(self, node: tuple, snake: Snake):
+        """
+        Similar to dead_checking, this method checks if a given node is a valid move
+        :return: Boolean
+        """
+        return not snake.board.is_free(node)
+
+
+@register_solver('bfs')
+class BFS(Player):
+    def __init__(self, snake: Snake, apple: Apple, time_aware: bool = False, **kwargs):
+        """
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param time_aware: if True, a body node is not an obstacle once the tail has left it by the time the head gets
+        there (see Snake.expiry), instead of being a wall for the whole search
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.time_aware = time_aware
+
+    def run_bfs(self):
+        """
+        Run BFS searching and return the full path of best way to apple from BFS searching. Without time_aware the
+        search only depends on the occupied cells, the head and the apple, so its result is kept in the transposition
+        table
+        """
+        if self.time_aware:
+            return self.search()
+        path = self.transposition(
+            ('bfs', self.snake.board.bits, self.snake.get_head(), self.apple.location), self.search
+        )
+        return list(path) if path else None
+
+    def search(self):
+        board = self.snake.board
+        self.metrics.count('bfs.searches')
+        if not board.is_inside(self.apple.location):
+            return None
+        start = board.index(self.snake.get_head())
+        goal = board.index(self.apple.location)
+        cells = board.cells
+        expiry = self.snake.expiry() if self.time_aware else None
+        neighbors = board.neighbors
+
+        # distances[index] is the number of steps to reach the cell, -1 if not reached yet
+        distances = [-1] * len(board.cells)
+        distances[start] = 0
+        # parents[index] is the cell it was reached from, the path is only rebuilt when the apple is found
+        parents = [-1] * len(board.cells)
+        queue = deque([start])
+        expanded = 0
+
+        while queue:
+            future_head = queue.popleft()
+            expanded += 1
+            distance = distances[future_head] + 1
+
+            # If snake eats the apple, return the full path from snake's head
+            if future_head == goal:
+                self.metrics.count('bfs.nodes_expanded', expanded)
+                return cell_path(board, parents, start, goal)
+
+            for index in neighbors[future_head]:
+                if distances[index] != -1:
+                    continue
+                if expiry is None:
+                    if cells[index]:
+                        continue
+                elif expiry[index] > distance:
+                    continue
+                distances[index] = distance
+                parents[index] = future_head
+                queue.append(index)
+
+        self.metrics.count('bfs.nodes_expanded', expanded)
+
+    def next_node(self):
+        """
+        Run the BFS searching and return the next move in this path
+        """
+        path = self.run_bfs()
+        return path[1] if path else None
+
+
+@register_solver('longest')
+class LongestPath(BFS):
+    """
+    Given shortest path, change it to the longest path
+    """
+
+    def __init__(self, snake: Snake, apple: Apple, **kwargs):
+        """
+        :param snake: Snake instance
+        :param apple: Apple instance
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.plan = PlanCache()
+
+    def next_node(self):
+        """
+        This solver is calculated per apple, not per move, so the longest path is followed while it is valid
+        """
+        next_node = self.plan.next_node(snake=self.snake, apple=self.apple)
+        if next_node is None:
+            with self.metrics.timer('longest_path.plan'):
+                path = self.run_longest()
+            if not path:
+                return None
+            self.plan.store(path=[self.snake.get_head()] + path, apple=self.apple)
+            next_node = self.plan.next_node(snake=self.snake, apple=self.apple)
+        return next_node
+
+    def run_longest(self):
+        """
+        For every move, check if it could be replace with three equivalent moves.
+        For example, for snake moving one step left, check if moving up, left, and down is valid. If yes, replace the
+        move with equivalent longer move. Start this over until no move can be replaced.
+        """
+        path = self.run_bfs()
+        self.metrics.count('longest_path.searches')
+
+        if path is None:
+            return
+
+        # Occupancy of the snake's body and the longest path, for checking if node replacement is valid.
+        # The snake's tail is not an obstacle, same as in Snake.dead_checking, unless the path already goes through it
+        board = self.snake.board
+        cells = bytearray(board.cells)
+        self.metrics.count('allocations.board')
+        path = [board.index(node) for node in path]
+        for index in path[1:]:
+            cells[index] += 1
+        tail = board.index(self.snake.body[0])
+        neighbors = board.neighbors
+        width = board.cell_width
+
+        def is_blocked(index, extra_index):
+            return extra_index not in neighbors[index] or cells[extra_index] > (extra_index == tail)
+
+        # The path as a singly linked list of cell indices: following[index] is the cell after it. Cells on the path
+        # are unique, so inserting the replacement cells between two cells is O(1)
+        following = dict(zip(path, path[1:]))
+
+        index = path[0]
+        while index in following:
+            next_index = following[index]
+            direction = index - next_index
+
+            # up -> left, up, right
+            # down -> right, down, left
+            # left -> up, left, down
+            # right -> down, right, up
+            # A step along a row turns into a step along a column and the other way around
+            diff = direction * width if direction in (1, -1) else -direction // width
+
+            extra_index_1 = index + diff
+            extra_index_2 = next_index + diff
+
+            if is_blocked(index, extra_index_1) or is_blocked(next_index, extra_index_2):
+                index = next_index
+            else:
+                # Add replacement nodes
+                following[index] = extra_index_1
+                following[extra_index_1] = extra_index_2
+                following[extra_index_2] = next_index
+                cells[extra_index_1] += 1
+                cells[extra_index_2] += 1
+
+        # Exclude the first node, which is same to snake's head
+        nodes = board.nodes
+        longest_path = []
+        index = path[0]
+        while index in following:
+            index = following[index]
+            longest_path.append(nodes[index])
+        return longest_path
+
+
+@register_solver('forwardcheck')
+class Fowardcheck(Player):
+    def __init__(self, snake: Snake, apple: Apple, time_aware: bool = False, **kwargs):
+        """
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param time_aware: search the path to the apple with body nodes expiring as the snake moves, see BFS. Whether
+        the snake survives the path is checked on the virtual snake either way
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.time_aware = time_aware
+        self.plan = PlanCache()
+
+    def next_node(self):
+        return self.run_forwardcheck()
+
+    def follow_tail(self):
+        """
+        Fallback when the apple is not safe: the first move of the longest path from snake's head to its tail
+        """
+        self.metrics.count('forwardcheck.longest_path_fallbacks')
+        with self.metrics.timer('forwardcheck.longest_path'):
+            snake_tail = Apple()
+            snake_tail.location = self.snake.body[0]
+            snake = Snake(
+                body=list(self.snake.body)[1:],
+                cell_size=self.snake.cell_size,
+                cell_width=self.snake.cell_width,
+                cell_height=self.snake.cell_height
+            )
+            self.metrics.count('allocations.snake')
+            longest_path = LongestPath(snake=snake, apple=snake_tail, **self.sub_solver_kwargs).run_longest()
+        if longest_path:
+            return longest_path[0]
+        # No way to the tail: move into the largest region left, as Mixed escapes
+        regions = self.bitboard.move_regions(
+            board=self.snake.board, head=self.snake.get_head(), tail=snake_tail.location
+        )
+        return max(regions, key=regions.get) if regions else None
+
+    def run_forwardcheck(self):
+        # Follow the path accepted for this apple, if it is still valid
+        next_node = self.plan.next_node(snake=self.snake, apple=self.apple)
+        if next_node is not None:
+            self.metrics.count('forwardcheck.plan_hits')
+            return next_node
+
+        with self.metrics.timer('forwardcheck.bfs'):
+            bfs = BFS(snake=self.snake, apple=self.apple, time_aware=self.time_aware, **self.sub_solver_kwargs)
+            path = bfs.run_bfs()
+
+        if path is None:
+            return self.follow_tail()
+
+        with self.metrics.timer('forwardcheck.virtual_snake'):
+            # Only whether the virtual snake reaches its tail matters here, not the longest path to it
+            is_safe = self.is_virtual_tail_reachable(path)
+        if not is_safe:
+            return self.follow_tail()
+
+        self.plan.store(path=path, apple=self.apple)
+        return self.plan.next_node(snake=self.snake, apple=self.apple)
+
+
+@register_solver('mixed')
+class Mixed(Player):
+    def __init__(self, snake: Snake, apple: Apple, time_aware: bool = False, **kwargs):
+        """
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param time_aware: search the path to the apple with body nodes expiring as the snake moves, see BFS. Whether
+        the snake survives the path is checked on the virtual snake either way
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.time_aware = time_aware
+        self.plan = PlanCache()
+
+    def tail_region(self):
+        """
+        Cells from which the snake's tail can be reached once the snake moved one step, see run_escape
+        """
+        self.metrics.count('bitboard.floods')
+        return self.bitboard.tail_region(board=self.snake.board, body=self.snake.body)
+
+    def cached_tail_region(self):
+        return self.transposition(
+            ('escape', self.snake.board.bits, self.snake.body[1], self.snake.body[0]), self.tail_region
+        )
+
+    def escape(self):
+        self.metrics.count('mixed.escape_fallbacks')
+        with self.metrics.timer('mixed.escape'):
+            return self.run_escape()
+
+    def run_escape(self):
+        head = self.snake.get_head()
+        board = self.snake.board
+        tail = board.index(self.snake.body[0])
+        tail_region = None
+        # Neighbours from which the snake can still reach its tail, by Manhattan distance to apple
+        candidates = []
+        for index in board.neighbors[board.index(head)]:
+            # Same as Snake.dead_checking: the tail moves forward together with the head
+            if board.cells[index] and index != tail:
+                continue
+            neibhour = board.nodes[index]
+            neibhour_apple_distance = (
+                abs(neibhour[0] - self.apple.location[0]) + abs(neibhour[1] - self.apple.location[1])
+            )
+            if not neibhour_apple_distance:
+                continue
+            # A virtual snake with a neibhour as head should have a way to its tail. Two nodes are removed from
+            # body: one for moving one step forward, one for avoiding dead checking. The virtual snakes of all
+            # neibhours share this body, so one flood fill from the tail answers for all of them
+            if tail_region is None:
+                tail_region = self.cached_tail_region()
+            if tail_region >> index & 1:
+                candidates.append((neibhour_apple_distance, neibhour))
+
+        newhead = None
+        if len(candidates) > 1:
+            # Prefer the moves which do not cut the free space apart, then the greatest distance to apple
+            splits = {
+                neibhour: self.transposition(
+                    ('splits', board.bits, neibhour, self.snake.body[0]),
+                    lambda: self.bitboard.splits(board=board, node=neibhour, tail=self.snake.body[0])
+                )
+                for _, neibhour in candidates
+            }
+            newhead = max(candidates, key=lambda candidate: (not splits[candidate[1]], candidate[0]))[1]
+        elif candidates:
+            newhead = candidates[0][1]
+        if newhead is not None:
+            self.candidate = newhead
+
+        if newhead is None:
+            # No move keeps a way to the tail: rather than dying now, move into the largest region, where the tail
+            # may open a way again
+            regions = self.bitboard.move_regions(board=self.snake.board, head=head, tail=self.snake.body[0])
+            if regions:
+                newhead = max(regions, key=regions.get)
+        return newhead
+
+    def next_node(self):
+        return self.run_mixed()
+
+    def run_mixed(self):
+        """
+        Mixed strategy
+        """
+        # Follow the path accepted for this apple, if it is still valid
+        next_node = self.plan.next_node(snake=self.snake, apple=self.apple)
+        if next_node is not None:
+            self.metrics.count('mixed.plan_hits')
+            return next_node
+
+        with self.metrics.timer('mixed.bfs'):
+            bfs = BFS(snake=self.snake, apple=self.apple, time_aware=self.time_aware, **self.sub_solver_kwargs)
+            path = bfs.run_bfs()
+
+        # If the snake does not have the path to apple, try to follow its tail to escape
+        if path is None:
+            return self.escape()
+
+        # Until the virtual snake is sent, the first step to the apple is the move to take if the tail can still be
+        # reached from it, as escape checks. Eating the apple does not move the tail, so the check does not tell then
+        if (
+            self.publish_candidate and path[1] != self.apple.location
+            and self.cached_tail_region() >> self.snake.board.index(path[1]) & 1
+        ):
+            self.candidate = path[1]
+
+        # Send a virtual snake to see when it reaches the apple, does it still have a path to its own tail, to keep it
+        # alive
+        with self.metrics.timer('mixed.virtual_snake'):
+            is_safe = self.is_virtual_tail_reachable(path)
+        if not is_safe:
+            return self.escape()
+        else:
+            self.plan.store(path=path, apple=self.apple)
+            return self.plan.next_node(snake=self.snake, apple=self.apple)
+
+
+@register_solver('astar')
+class Astar(Player):
+    def __init__(self, snake: Snake, apple: Apple, heuristic=manhattan, **kwargs):
+        """
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param heuristic: function (node, goal) -> estimated steps from node to goal. It should never overestimate,
+        otherwise the path found may not be the shortest one
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.heuristic = heuristic
+
+    def next_node(self):
+        path = self.run_astar()
+        return path[1] if path else None
+
+    def run_astar(self):
+        """
+        Run A* searching and return the full path from snake's head to apple, same as BFS.run_bfs
+        """
+        board = self.snake.board
+        start = board.index(self.snake.get_head())
+        goal_node = self.apple.location
+        if not board.is_inside(goal_node):
+            return None
+        goal = board.index(goal_node)
+        cells = board.cells
+        nodes = board.nodes
+        neighbors = board.neighbors
+
+        closed = bytearray(len(cells))
+        gscores = [None] * len(cells)
+        parents = [-1] * len(cells)
+        gscores[start] = 0
+
+        # Heap entries are (fscore, heuristic, insertion order, cell index): ties on fscore go to the cell closer to the
+        # goal, then to the oldest one. A cell is pushed again when a shorter way is found, stale entries are skipped
+        # on pop
+        tie_breaker = count()
+        start_heuristic = self.heuristic(nodes[start], goal_node)
+        open_list = [(start_heuristic, start_heuristic, next(tie_breaker), start)]
+        self.metrics.count('astar.searches')
+        expanded = 0
+
+        while open_list:
+            index = heappop(open_list)[3]
+            if closed[index]:
+                continue
+            expanded += 1
+
+            if index == goal:
+                self.metrics.count('astar.nodes_expanded', expanded)
+                return cell_path(board, parents, start, goal)
+
+            closed[index] = 1
+            tentative_gscore = gscores[index] + 1
+
+            for neighbor_index in neighbors[index]:
+                if cells[neighbor_index] or closed[neighbor_index]:
+                    continue
+                if gscores[neighbor_index] is None or tentative_gscore < gscores[neighbor_index]:
+                    gscores[neighbor_index] = tentative_gscore
+                    parents[neighbor_index] = index
+                    neighbor_heuristic = self.heuristic(nodes[neighbor_index], goal_node)
+                    heappush(
+                        open_list,
+                        (tentative_gscore + neighbor_heuristic, neighbor_heuristic, next(tie_breaker), neighbor_index)
+                    )
+
+        self.metrics.count('astar.nodes_expanded', expanded)
+
+
+@lru_cache(maxsize=None)
+def hamiltonian_cycles(cell_width: int, cell_height: int):
+    """
+    Build Hamiltonian cycles of a board, i.e. cycles visiting every cell once. They are computed once per board size.
+    Columns are visited in zigzag with the first row left as the way back (needs an even cell_width), rows are visited
+    in zigzag with the first column left as the way back (needs an even cell_height), each in both directions
+    :return: tuple of (cycle, order), where cycle is the tuple of nodes in visiting order and order[Board.index(node)]
+    is the position of node in cycle
+    """
+    def zigzag(width, height):
+        if width % 2 or height < 2:
+            return None
+        nodes = [(0, y) for y in range(height)]
+        for x in range(1, width):
+            rows = range(height - 1, 0, -1) if x % 2 else range(1, height)
+            nodes.extend((x, y) for y in rows)
+        nodes.extend((x, 0) for x in range(width - 1, 0, -1))
+        return nodes
+
+    cycles = []
+    columns = zigzag(cell_width, cell_height)
+    if columns:
+        cycles.extend([columns, columns[::-1]])
+    rows = zigzag(cell_height, cell_width)
+    if rows:
+        rows = [(x, y) for y, x in rows]
+        cycles.extend([rows, rows[::-1]])
+
+    result = []
+    for cycle in cycles:
+        order = [0] * (cell_width * cell_height)
+        for position, (x, y) in enumerate(cycle):
+            order[y * cell_width + x] = position
+        result.append((tuple(cycle), order))
+    return tuple(result)
+
+
+@register_solver('hamiltonian')
+class Hamiltonian(Player):
+    def __init__(self, snake: Snake, apple: Apple, shortcut_ratio: float = 0.5, **kwargs):
+        """
+        Follow a Hamiltonian cycle of the board, which guarantees a perfect game, and take shortcuts along it toward
+        the apple while the snake is short.
+        The body is kept in cycle order from tail to head, so the cells ahead of the head along the cycle are free until
+        the tail. Any move which does not jump past the tail keeps it that way
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param shortcut_ratio: shortcuts are only taken while the snake covers less than this part of the board
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.shortcut_ratio = shortcut_ratio
+
+        cycles = hamiltonian_cycles(self.snake.cell_width, self.snake.cell_height)
+        if not cycles:
+            raise ValueError("Hamiltonian cycles need an even cell_width or cell_height")
+
+        for self.cycle, self.order in cycles:
+            if self.is_in_cycle_order(self.snake.body):
+                break
+        else:
+            raise ValueError("Snake's body does not follow any Hamiltonian cycle of the board")
+
+    def cycle_distance(self, node_a: tuple, node_b: tuple):
+        """
+        Number of steps from node_a to node_b along the cycle
+        """
+        board = self.snake.board
+        return (self.order[board.index(node_b)] - self.order[board.index(node_a)]) % len(self.cycle)
+
+    def is_in_cycle_order(self, body: iter):
+        body = list(body)
+        steps = [self.cycle_distance(node_a, node_b) for node_a, node_b in zip(body, body[1:])]
+        return all(steps) and sum(steps) < len(self.cycle)
+
+    def next_node(self):
+        head = self.snake.get_head()
+        new_head = self.cycle[(self.order[self.snake.board.index(head)] + 1) % len(self.cycle)]
+
+        is_short = len(self.snake.body) < self.shortcut_ratio * len(self.cycle)
+        if not is_short or not self.snake.board.is_inside(self.apple.location):
+            return new_head
+
+        # Take the neighbour furthest along the cycle, without passing the apple nor reaching the tail
+        tail_distance = self.cycle_distance(head, self.snake.body[0])
+        apple_distance = self.cycle_distance(head, self.apple.location)
+        best_distance = 1
+        for neighbor_node in self._get_neighbors(head):
+            if not self.snake.board.is_inside(neighbor_node):
+                continue
+            distance = self.cycle_distance(head, neighbor_node)
+            if best_distance < distance <= apple_distance and distance < tail_distance:
+                best_distance = distance
+                new_head = neighbor_node
+        return new_head
+
@@ -0,0 +1,196 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import mmap
+import struct
+
+from model import DIRECTIONS, Apple, Base, Snake
+
+MAGIC = b'SNKR'
+VERSION = 1
+# Flags of a record
+GAVE_UP = 1  # the player had no move after the last one, which killed the snake
+
+# magic, version, flags, cell_width, cell_height, seed, length of the initial body, number of moves
+HEADER = struct.Struct('<4sBBHHqHI')
+
+
+def index_format(cell_width: int, cell_height: int):
+    """
+    Struct format of a cell index of the initial body: 2 bytes when they fit, so that records of most boards stay
+    small, 4 bytes beyond 65536 cells. The board size is in the header, so a record tells which one it uses
+    """
+    return 'H' if cell_width * cell_height <= 1 << 16 else 'I'
+
+
+class Recorder:
+    def __init__(self, cell_width: int, cell_height: int, body: iter, seed: int):
+        """
+        Record a game as its seed, its board size, the snake's initial body and one 2-bit index into DIRECTIONS per
+        move: the apples follow from the seed, so this is enough to play the game again without the solver.
+        Records are a few bytes plus a quarter of a byte per move, see to_bytes
+        :param body: the snake's body when the game starts
+        :param seed: seed of the apple locations of the game
+        """
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.body = [y * cell_width + x for x, y in body]
+        self.seed = seed
+        self.moves = bytearray()
+        self.count = 0
+        self.gave_up = False
+
+    def record(self, head: tuple, new_head: tuple):
+        """
+        :param head: snake's head before the move
+        :param new_head: the node the player moved to, None if it had no move
+        """
+        if new_head is None:
+            self.gave_up = True
+            return
+        direction = DIRECTIONS.index(Base.node_sub(new_head, head))
+        if self.count % 4 == 0:
+            self.moves.append(0)
+        self.moves[-1] |= direction << (self.count % 4 * 2)
+        self.count += 1
+
+    def to_bytes(self):
+        header = HEADER.pack(
+            MAGIC, VERSION, GAVE_UP if self.gave_up else 0, self.cell_width, self.cell_height, self.seed,
+            len(self.body), self.count
+        )
+        body = struct.pack(f'<{len(self.body)}{index_format(self.cell_width, self.cell_height)}', *self.body)
+        return header + body + bytes(self.moves)
+
+
+class Replay(Base):
+    def __init__(self, data: bytes, offset: int = 0, checkpoint_interval: int = 256):
+        """
+        Play a recorded game again from its moves, without running the solver
+        :param data: bytes holding the record, e.g. Recorder.to_bytes()
+        :param offset: Optional. Position of the record in data, for files of several records
+        :param checkpoint_interval: the state of the game is saved every this many steps, so that seeking to a step
+        only simulates the steps since the closest checkpoint
+        """
+        magic, version, flags, cell_width, cell_height, seed, length, count = HEADER.unpack_from(data, offset)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a snake replay, or an unsupported version")
+        super().__init__(cell_width=cell_width, cell_height=cell_height)
+        self.seed = seed
+        self.gave_up = bool(flags & GAVE_UP)
+        self.count = count
+
+        offset += HEADER.size
+        body = struct.Struct(f'<{length}{index_format(cell_width, cell_height)}')
+        self.body = [(index % cell_width, index // cell_width) for index in body.unpack_from(data, offset)]
+        offset += body.size
+        self.moves = bytes(data[offset:offset + (count + 3) // 4])
+        # Number of bytes of the record in data
+        self.size = HEADER.size + body.size + len(self.moves)
+
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints = {}
+        self.snake = None
+        self.apple = None
+        self.steps = 0
+        self.reset()
+
+    def __len__(self):
+        """
+        Number of steps of the game, including the last one without any move if the player gave up
+        """
+        return self.count + self.gave_up
+
+    def direction(self, step: int):
+        return DIRECTIONS[self.moves[step >> 2] >> (step % 4 * 2) & 3]
+
+    def reset(self):
+        """
+        Go back to the start of the game
+        """
+        kwargs = dict(cell_size=self.cell_size, cell_width=self.cell_width, cell_height=self.cell_height)
+        self.snake = Snake(body=self.body, **kwargs)
+        self.apple = Apple(seed=self.seed, **kwargs)
+        self.apple.refresh(snake=self.snake)
+        self.steps = 0
+
+    def step(self):
+        """
+        Make the next recorded move, the same way as Simulator.step
+        :return: the new head, or None if the player had no move
+        """
+        if self.steps >= len(self):
+            raise IndexError("The game is over")
+        if self.steps % self.checkpoint_interval == 0 and self.steps not in self.checkpoints:
+            self.checkpoints[self.steps] = self.save()
+
+        new_head = self.node_add(self.snake.get_head(), self.direction(self.steps)) if self.steps < self.count else None
+        self.snake.move(new_head=new_head, apple=self.apple)
+        self.steps += 1
+        if self.snake.eaten and len(self.snake.body) < self.cell_width * self.cell_height:
+            self.apple.refresh(snake=self.snake)
+        return new_head
+
+    def save(self):
+        # The free cells are part of the state: the next apple depends on their order, not only on which are free
+        free_cells = self.snake.free_cells
+        return (
+            tuple(self.snake.body), self.snake.score, self.snake.is_dead, self.apple.location,
+            self.apple.random.getstate(), list(free_cells.cells), list(free_cells.positions)
+        )
+
+    def restore(self, step: int):
+        body, score, is_dead, location, random_state, cells, positions = self.checkpoints[step]
+        self.snake = Snake(
+            body=body, cell_size=self.cell_size, cell_width=self.cell_width, cell_height=self.cell_height
+        )
+        self.snake.score = score
+        self.snake.is_dead = is_dead
+        free_cells = self.snake.free_cells
+        free_cells.cells = list(cells)
+        free_cells.positions = list(positions)
+        self.apple.location = location
+        self.apple.random.setstate(random_state)
+        self.steps = step
+
+    def seek(self, step: int):
+        """
+        Go to the state of the game after a number of steps, from the closest checkpoint before it
+        :return: (snake, apple) after step steps
+        """
+        if not 0 <= step <= len(self):
+            raise IndexError(f"Step should fall in [0, {len(self)}]")
+        checkpoint = max((saved for saved in self.checkpoints if saved <= step), default=0)
+        if step < self.steps or checkpoint > self.steps:
+            if checkpoint in self.checkpoints:
+                self.restore(checkpoint)
+            else:
+                self.reset()
+        while self.steps < step:
+            self.step()
+        return self.snake, self.apple
+
+
+def save_replays(path: str, recorders: iter, append: bool = True):
+    """
+    Write records one after the other into a single file
+    :param recorders: Recorder instances
+    :param append: if False, overwrite the file instead of adding the records at its end
+    """
+    with open(path, 'ab' if append else 'wb') as file:
+        for recorder in recorders:
+            file.write(recorder.to_bytes())
+
+
+def load_replays(path: str, **kwargs):
+    """
+    Read the records of a file written by save_replays. The file is memory-mapped, so that only the records read are
+    loaded
+    :return: generator of Replay instances
+    """
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        offset = 0
+        while offset < len(data):
+            replay = Replay(data, offset=offset, **kwargs)
+            offset += replay.size
+            yield replay
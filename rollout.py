@@ -0,0 +1,208 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import multiprocessing
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from functools import lru_cache
+
+from model import DIRECTIONS, Apple, Snake
+from players import Mixed, Player, register_solver
+
+
+def run_rollouts(task):
+    """
+    Play random continuations of a game with a cheap default policy: move toward the apple, picking randomly among the
+    moves which get as close, and sometimes any move which does not die at once. New apples are random free cells
+    :param task: (cell_width, cell_height, body, apple, seeds, depth, exploration, discount, deadline). apple may be
+    None when the last move ate it, then a new one is drawn. deadline is a time.time() after which the continuations
+    stop, None for no limit
+    :return: list of (steps survived, apples eaten discounted by how late they were eaten), one per seed. Shorter when
+    the deadline passed, a continuation cut short being left out
+    """
+    width, height, body, apple, seeds, depth, exploration, discount, deadline = task
+    area = width * height
+    results = []
+    for seed in seeds:
+        if deadline is not None and time.time() >= deadline:
+            break
+        rng = random.Random(seed)
+        snake = deque(body)
+        cells = bytearray(area)
+        for x, y in snake:
+            cells[y * width + x] += 1
+        location = apple
+        reward = 0
+        survived = depth
+
+        for step in range(depth):
+            # A continuation on a large board may itself outlast the deadline
+            if deadline is not None and step % 256 == 255 and time.time() >= deadline:
+                return results
+            if location is None:
+                if len(snake) >= area:
+                    break
+                # Rejection sampling is fast while the board is not full, which is when rollouts matter
+                while True:
+                    index = rng.randrange(area)
+                    if not cells[index]:
+                        location = (index % width, index // width)
+                        break
+
+            head_x, head_y = snake[-1]
+            moves = []
+            for dx, dy in DIRECTIONS:
+                x, y = head_x + dx, head_y + dy
+                if 0 <= x < width and 0 <= y < height and (not cells[y * width + x] or (x, y) == snake[0]):
+                    moves.append((x, y))
+            if not moves:
+                survived = step
+                break
+
+            if rng.random() >= exploration:
+                distances = [abs(x - location[0]) + abs(y - location[1]) for x, y in moves]
+                moves = [move for move, distance in zip(moves, distances) if distance == min(distances)]
+            node = rng.choice(moves)
+
+            if node == location:
+                reward += discount**step
+                location = None
+            else:
+                tail_x, tail_y = snake.popleft()
+                cells[tail_y * width + tail_x] -= 1
+            snake.append(node)
+            cells[node[1] * width + node[0]] += 1
+        results.append((survived, reward))
+    return results
+
+
+@lru_cache(maxsize=None)
+def process_pool(workers: int):
+    """
+    One process pool per number of workers, shared by all players and shut down when the interpreter exits
+    """
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+@register_solver('rollout')
+class Rollout(Player):
+    def __init__(
+        self,
+        snake: Snake,
+        apple: Apple,
+        rollouts: int = 16,
+        depth: int = None,
+        exploration: float = 0.1,
+        discount: float = 0.95,
+        margin: float = 0.25,
+        budget: float = 0.2,
+        workers: int = None,
+        seed: int = None,
+        **kwargs
+    ):
+        """
+        Monte-Carlo lookahead on top of Mixed: every possible move is scored by random continuations of the game (see
+        run_rollouts), and the move of Mixed is overridden when another move survives clearly more often, the apples
+        eaten breaking ties. Continuations do not plan for one apple only, so they still tell the safer moves apart
+        when the board is nearly full and Mixed runs out of safe paths.
+        Rollouts of every move run in parallel on a process pool. When they do not finish within the time budget, the
+        move of Mixed is taken
+        :param snake: Snake instance
+        :param apple: Apple instance
+        :param rollouts: number of continuations per move
+        :param depth: Optional. Number of steps of a continuation, defaults to the board area
+        :param exploration: probability of a random move instead of a move toward the apple in a continuation
+        :param discount: an apple eaten after n steps of a continuation is worth discount ** n, so that the moves
+        eating sooner are preferred
+        :param margin: the move of Mixed is kept unless another move survives this much more often
+        :param budget: seconds per move for the rollouts
+        :param workers: Optional. Number of processes, defaults to the number of cores. With 0, or in a daemonic
+        process which cannot start a pool (e.g. a benchmark worker), rollouts run in this process
+        :param seed: Optional. Seed of the continuations
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.rollouts = rollouts
+        self.depth = depth or snake.cell_width * snake.cell_height
+        self.exploration = exploration
+        self.discount = discount
+        self.margin = margin
+        self.budget = budget
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        if multiprocessing.current_process().daemon:
+            self.workers = 0
+        self.random = random.Random(seed)
+        self.fallback = Mixed(snake=snake, apple=apple, **self.sub_solver_kwargs)
+
+    def observe(self, snake: Snake, apple: Apple):
+        super().observe(snake=snake, apple=apple)
+        self.fallback.observe(snake=snake, apple=apple)
+
+    def candidates(self):
+        """
+        :return: list of (move, body after the move, apple left for the continuation)
+        """
+        body = list(self.snake.body)
+        candidates = []
+        for node in self._get_neighbors(self.snake.get_head()):
+            if self.snake.dead_checking(head=node, check=True):
+                continue
+            if node == self.apple.location:
+                candidates.append((node, tuple(body + [node]), None))
+            else:
+                candidates.append((node, tuple(body[1:] + [node]), self.apple.location))
+        return candidates
+
+    def evaluate(self, candidates: list):
+        """
+        :return: list of rollout results per candidate, or None if the budget ran out
+        """
+        # Wall clock time, which worker processes share. The rollouts stop on their own once it passes, so that those
+        # already running do not keep the pool busy for the next moves
+        deadline = time.time() + self.budget
+        tasks = [(
+            self.snake.cell_width, self.snake.cell_height, body, apple,
+            [self.random.getrandbits(64) for _ in range(self.rollouts)], self.depth, self.exploration, self.discount,
+            deadline
+        ) for _, body, apple in candidates]
+
+        if not self.workers:
+            results = [run_rollouts(task) for task in tasks]
+        else:
+            futures = [process_pool(self.workers).submit(run_rollouts, task) for task in tasks]
+            done, pending = wait(futures, timeout=self.budget)
+            if pending:
+                # Those not started yet are dropped, the others are about to stop
+                for future in pending:
+                    future.cancel()
+                return None
+            results = [future.result() for future in futures]
+        if any(len(result) < self.rollouts for result in results):
+            return None
+        return results
+
+    def next_node(self):
+        candidates = self.candidates()
+        if len(candidates) < 2:
+            return candidates[0][0] if candidates else None
+
+        suggested = self.fallback.next_node()
+        self.metrics.count('rollout.moves')
+        with self.metrics.timer('rollout.evaluate'):
+            results = self.evaluate(candidates)
+        if results is None:
+            self.metrics.count('rollout.budget_exhausted')
+            return suggested
+        self.metrics.count('rollout.continuations', self.rollouts * len(candidates))
+
+        values = {
+            move: (sum(survived == self.depth for survived, _ in result), sum(reward for _, reward in result))
+            for (move, _, _), result in zip(candidates, results)
+        }
+        best = max(values, key=values.get)
+        # Keep the move of Mixed unless another one clearly survives more often
+        if suggested in values and values[suggested][0] >= values[best][0] - self.margin * self.rollouts:
+            return suggested
+        self.metrics.count('rollout.overrides')
+        return best
@@ -0,0 +1,328 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import uuid
+from collections import OrderedDict
+from itertools import count
+from concurrent.futures import ProcessPoolExecutor
+
+from model import DIRECTIONS, Apple, Snake
+from players import Player
+from simulator import Simulator
+from solvers import SOLVERS, headless_solvers
+
+# Players of the sessions decided in this process, by session, least recently used first
+PLAYERS = OrderedDict()
+MAX_PLAYERS = 1024
+
+
+def decide(task):
+    """
+    Decide the next move of a session, in its worker process. The player of a session is kept by the worker, so its plan
+    and transposition table carry over to the next moves, and the moves are the ones of the same solver in a Simulator
+    :param task: (session, solver, cell_width, cell_height, body, apple location)
+    :return: (new_head_x, new_head_y), or None if there is no move
+    """
+    session, solver, width, height, body, apple_location = task
+    kwargs = dict(cell_width=width, cell_height=height)
+    snake = Snake(body=body, **kwargs)
+    apple = Apple(**kwargs)
+    apple.location = apple_location
+
+    player = PLAYERS.pop(session, None)
+    if player is None:
+        player = SOLVERS[solver](snake=snake, apple=apple, **kwargs)
+    else:
+        player.observe(snake=snake, apple=apple)
+    PLAYERS[session] = player
+    while len(PLAYERS) > MAX_PLAYERS:
+        PLAYERS.popitem(last=False)[1].close()
+    return player.next_node()
+
+
+def forget(session: str):
+    """
+    Drop the player of a session which is over, in its worker process
+    """
+    player = PLAYERS.pop(session, None)
+    if player is not None:
+        player.close()
+
+
+class Relay(Player):
+    def __init__(self, snake: Snake, apple: Apple, **kwargs):
+        """
+        Player of a server session: the server sets the move, decided by a worker process or by the client
+        """
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.move = None
+
+    def next_node(self):
+        return self.move
+
+
+class Session:
+    def __init__(self, writer: asyncio.StreamWriter, solver: str = None, **kwargs):
+        """
+        One game of the server, sent to the connection which started it. The game is played by a Simulator, so the
+        rules, the apples of a seed and the end of the game are the ones of headless games
+        :param writer: StreamWriter of the connection
+        :param solver: Optional. Name of the solver in SOLVERS, None for a game moved by the client
+        :param kwargs: options of the Simulator, e.g. seed, max_idle_steps and the board size
+        """
+        self.id = uuid.uuid4().hex
+        self.writer = writer
+        # The process pool deciding the moves, see GameServer.executors
+        self.executor = None
+        self.solver = solver
+        self.simulator = Simulator(player_class=Relay, **kwargs)
+        self.simulator.reset()
+        # The direction a client moves its snake in, until it asks for another one
+        self.direction = self.simulator.snake.last_direction
+        # Decision of the solver being computed, see GameServer.tick
+        self.decision = None
+
+    def task(self):
+        simulator = self.simulator
+        return (
+            self.id, self.solver, simulator.cell_width, simulator.cell_height, tuple(simulator.snake.body),
+            simulator.apple.location
+        )
+
+    def move(self, new_head: tuple):
+        self.simulator.player.move = new_head
+        self.simulator.step()
+
+    def state(self):
+        return {
+            'op': 'state',
+            'session': self.id,
+            'step': self.simulator.steps,
+            'head': self.simulator.snake.get_head(),
+            'apple': self.simulator.apple.location,
+            'score': self.simulator.snake.score,
+        }
+
+    def result(self):
+        result = self.simulator.result()
+        return {
+            'op': 'over',
+            'session': self.id,
+            'score': result.score,
+            'steps': result.steps,
+            'is_dead': result.is_dead,
+            'completed': result.completed,
+        }
+
+
+class GameServer:
+    def __init__(self, tick: float = 0.05, workers: int = None, max_sessions: int = 1024):
+        """
+        Many games at once over TCP, one JSON message per line. A client starts games with
+        {"op": "new", "solver": "mixed", "width": 12, "height": 12, "seed": 0, "max_idle_steps": 1000}, every field
+        but "op" being optional, and gets {"op": "new", "session": id, "body": [...], "apple": [x, y]} back. A game
+        without a solver is moved by the client with {"op": "move", "session": id, "direction": index into DIRECTIONS}
+        and stopped with {"op": "close", "session": id}.
+        All games move on a shared tick: every tick, each game moves one step and a {"op": "state", ...} message is
+        sent to its client, then {"op": "over", ...} when it ends. Decisions of the solvers run in worker processes: a
+        game whose decision is not ready yet waits for the next tick, so a slow search never stalls the event loop nor
+        the games of the other workers. Every game sticks to one worker, which keeps its solver between moves
+        :param tick: seconds between two steps of the games, 0 for as fast as the solvers go
+        :param workers: Optional. Number of processes deciding the moves, defaults to the number of cores. With 0, the
+        moves are decided in the tick, in this process
+        :param max_sessions: games played at once, new games are refused beyond
+        """
+        self.tick_seconds = tick
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.max_sessions = max_sessions
+        # One single process pool per worker, so that the moves of a game are always decided by the same process
+        self.executors = [ProcessPoolExecutor(max_workers=1) for _ in range(self.workers)]
+        self.assignments = count()
+        self.sessions = {}
+        self.server = None
+        self.ticker = None
+        # Set when a game starts, the ticker waits for it while there is no game
+        self.wakeup = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0):
+        """
+        Listen for clients and start ticking
+        :param port: 0 for any free port, see self.port
+        """
+        self.wakeup = asyncio.Event()
+        self.server = await asyncio.start_server(self.handle, host=host, port=port)
+        self.ticker = asyncio.create_task(self.run())
+        return self
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.ticker.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+        # Decisions which have not started yet are dropped rather than waited for
+        for session in self.sessions.values():
+            if session.decision is not None:
+                session.decision.cancel()
+        for executor in self.executors:
+            executor.shutdown(wait=False)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.sessions:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            start = loop.time()
+            self.tick()
+            await asyncio.sleep(max(0.0, self.tick_seconds - (loop.time() - start)))
+
+    def tick(self):
+        for session in list(self.sessions.values()):
+            if session.solver is None:
+                head = session.simulator.snake.get_head()
+                new_head = (head[0] + session.direction[0], head[1] + session.direction[1])
+            else:
+                if session.decision is None:
+                    session.decision = self.submit(session)
+                if not session.decision.done():
+                    continue
+                decision, session.decision = session.decision, None
+                try:
+                    new_head = decision.result()
+                except Exception as error:
+                    # e.g. the Hamiltonian solver on a board without any Hamiltonian cycle
+                    self.end(session, {'op': 'error', 'session': session.id, 'message': str(error)})
+                    continue
+
+            session.move(new_head)
+            if not session.simulator.snake.is_dead:
+                self.send(session.writer, session.state())
+            if session.simulator.is_over():
+                self.end(session, session.result())
+            elif session.solver is not None:
+                # The next move is decided while waiting for the next tick
+                session.decision = self.submit(session)
+
+    def submit(self, session: Session):
+        """
+        :return: future of the next move of session
+        """
+        if session.executor is None:
+            future = asyncio.get_running_loop().create_future()
+            try:
+                future.set_result(decide(session.task()))
+            except Exception as error:
+                future.set_exception(error)
+            return future
+        return asyncio.get_running_loop().run_in_executor(session.executor, decide, session.task())
+
+    def remove(self, session: Session):
+        self.sessions.pop(session.id, None)
+        if session.solver is None:
+            return
+        if session.executor is None:
+            forget(session.id)
+        else:
+            session.executor.submit(forget, session.id)
+
+    def end(self, session: Session, message: dict):
+        self.remove(session)
+        self.send(session.writer, message)
+
+    @staticmethod
+    def send(writer: asyncio.StreamWriter, message: dict):
+        # Writes are buffered, a slow client only delays its own messages
+        if not writer.is_closing():
+            writer.write(json.dumps(message).encode() + b'\n')
+
+    def new_session(self, writer: asyncio.StreamWriter, request: dict):
+        solver = request.get('solver')
+        if solver is not None and solver not in headless_solvers():
+            raise ValueError(f"Unknown solver {solver}, should be among {headless_solvers()}")
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError(f"The server already plays {self.max_sessions} games")
+        session = Session(
+            writer=writer,
+            solver=solver,
+            seed=request.get('seed'),
+            max_idle_steps=request.get('max_idle_steps'),
+            cell_width=request.get('width', 12),
+            cell_height=request.get('height', 12),
+        )
+        if self.executors:
+            session.executor = self.executors[next(self.assignments) % len(self.executors)]
+        self.sessions[session.id] = session
+        self.wakeup.set()
+        snake, apple = session.simulator.snake, session.simulator.apple
+        return {'op': 'new', 'session': session.id, 'body': list(snake.body), 'apple': apple.location}
+
+    def request(self, writer: asyncio.StreamWriter, request: dict):
+        """
+        :return: the reply to a request of a client, if any
+        """
+        if not isinstance(request, dict):
+            raise ValueError(f"Requests are JSON objects, not {json.dumps(request)}")
+        op = request.get('op')
+        if op == 'new':
+            return self.new_session(writer, request)
+
+        session = self.sessions.get(request.get('session'))
+        if session is None or session.writer is not writer:
+            raise ValueError(f"Unknown session {request.get('session')}")
+        if op == 'move':
+            if session.solver is not None:
+                raise ValueError('The moves of this session are decided by its solver')
+            direction = request.get('direction')
+            if not isinstance(direction, int) or not 0 <= direction < len(DIRECTIONS):
+                raise ValueError(f"Unknown direction {direction}, should be an index into {DIRECTIONS}")
+            session.direction = DIRECTIONS[direction]
+        elif op == 'close':
+            self.remove(session)
+            return {'op': 'closed', 'session': session.id}
+        else:
+            raise ValueError(f"Unknown op {op}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            async for line in reader:
+                try:
+                    reply = self.request(writer, json.loads(line))
+                except (ValueError, KeyError, IndexError, TypeError) as error:
+                    reply = {'op': 'error', 'message': str(error)}
+                if reply is not None:
+                    self.send(writer, reply)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # The games of a client end with its connection
+            for session in [session for session in self.sessions.values() if session.writer is writer]:
+                self.remove(session)
+            writer.close()
+
+
+async def serve(host: str, port: int, tick: float, workers: int = None):
+    server = await GameServer(tick=tick, workers=workers).start(host=host, port=port)
+    print(f"Listening on {host}:{server.port}")
+    await server.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve many headless snake games at once over TCP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--tick', type=float, default=0.05, help='seconds between two steps of the games')
+    parser.add_argument('--workers', type=int, help='number of processes deciding the moves')
+    args = parser.parse_args(argv)
+    asyncio.run(serve(host=args.host, port=args.port, tick=args.tick, workers=args.workers))
+
+
+if __name__ == '__main__':
+    main()
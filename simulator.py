@@ -0,0 +1,133 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import random
+from dataclasses import dataclass
+
+from metrics import Metrics
+from model import Apple, Base, Snake
+from replay import Recorder
+
+
+@dataclass
+class GameResult:
+    score: int
+    steps: int
+    is_dead: bool
+    completed: bool
+    metrics: Metrics = None
+
+
+class Simulator(Base):
+    def __init__(
+        self,
+        player_class,
+        initial_length: int = 3,
+        seed: int = None,
+        max_steps: int = None,
+        max_idle_steps: int = None,
+        profile: bool = False,
+        record: bool = False,
+        **kwargs
+    ):
+        """
+        Play games without any display: the game model and the solver only
+        :param player_class: a Player subclass deciding the moves
+        :param initial_length: The initial length of the snake
+        :param seed: Optional. Seed of the apple locations, every game with the same seed is the same
+        :param max_steps: Optional. Stop the game after this many steps, for solvers which may loop forever
+        :param max_idle_steps: Optional. Stop the game after this many steps without eating an apple
+        :param profile: if True, profile the player's decisions with cProfile, see Metrics.to_dict()
+        :param record: if True, record the moves of every game into self.recorder, see replay.Replay. Games without a
+        seed get a random one, so that they can be played again
+        """
+        super().__init__(**kwargs)
+        self.player_class = player_class
+        self.initial_length = initial_length
+        self.seed = seed
+        self.max_steps = max_steps
+        self.max_idle_steps = max_idle_steps
+        self.profile = profile
+        self.record = record
+        self.kwargs = kwargs
+
+        self.snake = None
+        self.apple = None
+        self.player = None
+        self.steps = 0
+        self.idle_steps = 0
+        self.metrics = None
+        self.recorder = None
+
+    def reset(self):
+        """
+        Start a new game
+        """
+        seed = self.seed
+        if self.record and seed is None:
+            seed = random.randrange(2**63)
+        self.snake = Snake(initial_length=self.initial_length, **self.kwargs)
+        self.apple = Apple(seed=seed, **self.kwargs)
+        if self.record:
+            self.recorder = Recorder(
+                cell_width=self.cell_width, cell_height=self.cell_height, body=self.snake.body, seed=seed
+            )
+        self.apple.refresh(snake=self.snake)
+        self.metrics = Metrics(profile=self.profile)
+        self.player = self.player_class(snake=self.snake, apple=self.apple, metrics=self.metrics, **self.kwargs)
+        self.steps = 0
+        self.idle_steps = 0
+
+    def is_over(self):
+        return (
+            self.snake.is_dead or self.is_completed()
+            or (self.max_steps is not None and self.steps >= self.max_steps)
+            or (self.max_idle_steps is not None and self.idle_steps >= self.max_idle_steps)
+        )
+
+    def is_completed(self):
+        return len(self.snake.body) >= self.cell_width * self.cell_height
+
+    def step(self):
+        """
+        Ask the player for a move and make it
+        :return: the new head, or None if the player has no move
+        """
+        # Latencies are also grouped by the part of the board covered by the snake, in steps of 10%
+        area = self.cell_width * self.cell_height
+        self.metrics.group = f'{10 * (10 * len(self.snake.body) // area)}%'
+        with self.metrics.profiling(), self.metrics.timer('decision'):
+            new_head = self.player.next_node()
+        if self.recorder is not None:
+            self.recorder.record(head=self.snake.get_head(), new_head=new_head)
+
+        self.snake.move(new_head=new_head, apple=self.apple)
+        self.steps += 1
+        self.idle_steps += 1
+
+        if self.snake.eaten:
+            self.idle_steps = 0
+            if not self.is_completed():
+                self.apple.refresh(snake=self.snake)
+
+        return new_head
+
+    def result(self):
+        return GameResult(
+            score=self.snake.score,
+            steps=self.steps,
+            is_dead=self.snake.is_dead,
+            completed=self.is_completed(),
+            metrics=self.metrics,
+        )
+
+    def run(self):
+        """
+        Play one full game
+        :return: GameResult
+        """
+        self.reset()
+        while not self.is_over():
+            self.step()
+        self.player.close()
+        return self.result()
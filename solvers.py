@@ -0,0 +1,16 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+# Solvers register into SOLVERS where they are defined. This module imports every module defining a headless solver,
+# and nothing imports it back, so that the command line, the benchmark and the server see all of them whatever was
+# imported before
+import rollout  # noqa: F401
+from players import SOLVERS
+
+
+def headless_solvers():
+    """
+    :return: sorted names of the solvers playing without a window. A human player is only in SOLVERS once the GUI is
+    imported, and never among them
+    """
+    return sorted(name for name, player_class in SOLVERS.items() if player_class.headless)
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import threading
+import time
+import unittest
+from functools import partial
+
+from anytime import Anytime
+from snake import Apple, Mixed, Player, Simulator, Snake
+
+
+class SlowPlayer(Player):
+    def __init__(self, snake: Snake, apple: Apple, release: threading.Event = None, **kwargs):
+        super().__init__(snake=snake, apple=apple, **kwargs)
+        self.release = release
+
+    def next_node(self):
+        self.release.wait()
+        return self.node_add(self.snake.get_head(), (0, -1))
+
+
+class TestAnytime(unittest.TestCase):
+    def test_deadline(self):
+        snake = Snake(body=[(0, 2), (0, 1), (0, 0)], cell_width=5, cell_height=5)
+        apple = Apple(cell_width=5, cell_height=5)
+        apple.location = (4, 4)
+        release = threading.Event()
+
+        player = Anytime(
+            snake=snake,
+            apple=apple,
+            solver=SlowPlayer,
+            deadline=0.01,
+            solver_kwargs={'release': release},
+            cell_width=5,
+            cell_height=5
+        )
+        start = time.perf_counter()
+        # The only move from the corner, without waiting for the solver
+        self.assertEqual(player.next_node(), (1, 0))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(player.metrics.counters['anytime.deadline_misses'], 1)
+
+        release.set()
+        player.close()
+
+    def test_speculation(self):
+        # Without a deadline, the moves are the ones of the solver, mostly decided before they are asked for
+        kwargs = dict(seed=0, cell_width=6, cell_height=6)
+        expected = Simulator(player_class=Mixed, **kwargs).run()
+        result = Simulator(player_class=partial(Anytime, solver=Mixed, deadline=None), **kwargs).run()
+
+        self.assertEqual((result.score, result.steps), (expected.score, expected.steps))
+        self.assertEqual(result.metrics.counters['anytime.deadline_misses'], 0)
+        self.assertGreater(result.metrics.counters['anytime.speculation_hits'], result.steps / 2)
+
+    def test_deadline_play_survives(self):
+        # With no time at all, most moves are the search's candidate or the quick move, which keep a way to the tail
+        for seed in range(5):
+            kwargs = dict(seed=seed, max_idle_steps=128, cell_width=8, cell_height=8)
+            expected = Simulator(player_class=Mixed, **kwargs).run()
+            result = Simulator(player_class=partial(Anytime, solver=Mixed, deadline=0), **kwargs).run()
+            self.assertGreater(result.metrics.counters['anytime.deadline_misses'], 0)
+            self.assertLessEqual(result.is_dead, expected.is_dead)
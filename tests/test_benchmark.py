@@ -0,0 +1,24 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import unittest
+from benchmark import run_benchmark, run_game
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_game_is_seeded(self):
+        task = ('bfs', 6, 6, 3, 72, None)
+        self.assertEqual(run_game(task)['score'], run_game(task)['score'])
+        self.assertIn('error', run_game(('hamiltonian', 5, 5, 0, 50, None)))
+
+    def test_run_benchmark(self):
+        games, summary, metrics = run_benchmark(
+            solvers=['bfs', 'hamiltonian'], sizes=[(6, 6)], seeds=range(2), workers=2
+        )
+
+        self.assertEqual(len(games), 4)
+        self.assertEqual([row['solver'] for row in summary], ['bfs', 'hamiltonian'])
+        for row in summary:
+            self.assertEqual(row['games'], 2)
+            self.assertLessEqual(row['latency_p50_ms'], row['latency_max_ms'])
+        self.assertGreater(metrics[0].counters['bfs.searches'], 0)
@@ -0,0 +1,54 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import unittest
+from bitboard import Bitboard, popcount
+from snake import Board, DistanceField
+
+
+class TestBitboard(unittest.TestCase):
+    def test_board_bits(self):
+        board = Board(body=[(0, 0), (1, 0), (1, 0)], cell_width=4, cell_height=3)
+        self.assertEqual(board.bits, 0b11)
+        board.release((1, 0))
+        self.assertEqual(board.bits, 0b11)
+        board.release((1, 0))
+        self.assertEqual(board.bits, 0b1)
+        self.assertEqual(board.copy().bits, 0b1)
+
+    def test_flood(self):
+        # A wall on column 2: the region of the left side must not leak through the row ends
+        wall = [(2, y) for y in range(4)]
+        board = Board(body=wall, cell_width=5, cell_height=4)
+        bitboard = Bitboard(cell_width=5, cell_height=4)
+        region = bitboard.flood(bitboard.bit((0, 0)), bitboard.free(board))
+
+        field = DistanceField(board=board, source=(0, 0))
+        self.assertEqual(popcount(region), sum(distance >= 0 for distance in field.distances))
+        self.assertFalse(region & bitboard.bit((4, 0)))
+
+        # Stops early once the target is reached
+        target = bitboard.bit((0, 1))
+        self.assertLess(popcount(bitboard.flood(bitboard.bit((0, 0)), bitboard.free(board), target=target)), 8)
+
+    def test_move_regions(self):
+        # The head at (2, 1) of a 5x3 board, with the body above and below it: moving left or right splits the board
+        body = [(2, 0), (2, 2), (2, 1)]
+        board = Board(body=body, cell_width=5, cell_height=3)
+        bitboard = Bitboard(cell_width=5, cell_height=3)
+
+        regions = bitboard.move_regions(board=board, head=(2, 1))
+        self.assertEqual(regions, {(3, 1): 5, (1, 1): 5})
+        regions = bitboard.move_regions(board=board, head=(2, 1), tail=(2, 0))
+        self.assertEqual(regions[(3, 1)], 12)
+
+    def test_splits(self):
+        # A wall on column 2 but for (2, 1): that cell is the only way between the two sides of the board
+        body = [(2, 0), (2, 2), (2, 3)]
+        board = Board(body=body, cell_width=5, cell_height=4)
+        bitboard = Bitboard(cell_width=5, cell_height=4)
+
+        self.assertTrue(bitboard.splits(board=board, node=(2, 1)))
+        self.assertFalse(bitboard.splits(board=board, node=(0, 1)))
+        # Once the tail at (2, 0) moves away, the sides stay joined through it
+        self.assertFalse(bitboard.splits(board=board, node=(2, 1), tail=(2, 0)))
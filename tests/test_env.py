@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import random
+import unittest
+
+from env import SnakeEnv
+from model import DIRECTIONS
+from snake import Apple, Base, DistanceField, Snake
+
+
+class TestSnakeEnv(unittest.TestCase):
+    def test_same_rules_as_snake(self):
+        env = SnakeEnv(seed=1, cell_width=6, cell_height=5)
+        observation, _ = env.reset()
+        planes = dict(observation)
+        snake = Snake(cell_width=6, cell_height=5)
+        apple = Apple(cell_width=6, cell_height=5)
+        rng = random.Random(2)
+
+        terminated = False
+        while not terminated:
+            action = rng.randrange(len(DIRECTIONS))
+            apple.location = env.apple.location
+            snake.move(new_head=Base.node_add(snake.get_head(), DIRECTIONS[action]), apple=apple)
+            observation, reward, terminated, _, info = env.step(action)
+
+            self.assertEqual(reward, -1 if snake.is_dead else int(snake.eaten))
+            self.assertEqual(info['score'], snake.score)
+            if not snake.is_dead:
+                self.assertEqual(list(observation['body'].reshape(-1)), list(snake.board.cells))
+                self.assertEqual(observation['head'].sum(), 1)
+                self.assertEqual(observation['head'][snake.get_head()[1], snake.get_head()[0]], 1)
+                self.assertEqual(observation['apple'][env.apple.location[1], env.apple.location[0]], 1)
+            # The planes are updated in place
+            for name, plane in planes.items():
+                self.assertIs(observation[name], plane)
+
+        self.assertTrue(snake.is_dead)
+        with self.assertRaises(RuntimeError):
+            env.step(0)
+
+    def test_planes_are_reused_and_read_only(self):
+        env = SnakeEnv(seed=0, features=('apple_distance', ), cell_width=5, cell_height=5)
+        first, _ = env.reset()
+        kept = dict(first)
+        env.step(2)
+        second, _ = env.reset()
+
+        for name, plane in kept.items():
+            self.assertIs(second[name], plane)
+            with self.assertRaises(ValueError):
+                plane[0, 0] = 7
+        # The planes follow the new game, not the one they were taken from
+        self.assertEqual(list(second['body'].reshape(-1)), list(env.snake.board.cells))
+
+    def test_apple_distance(self):
+        env = SnakeEnv(seed=0, features=('apple_distance', ), cell_width=5, cell_height=5)
+        env.reset()
+        observation, *_ = env.step(2)
+
+        field = DistanceField(board=env.snake.board, source=env.apple.location)
+        self.assertEqual(list(observation['apple_distance'].reshape(-1)), field.distances)
+
+    def test_seed_and_truncation(self):
+        env = SnakeEnv(max_idle_steps=2, cell_width=5, cell_height=5)
+        observation, _ = env.reset(seed=3)
+        apple = observation['apple'].copy()
+        env.step(2)
+        *_, truncated, _ = env.step(0)
+
+        self.assertTrue(truncated)
+        observation, _ = env.reset(seed=3)
+        self.assertEqual(observation['apple'].tolist(), apple.tolist())
+
+        with self.assertRaises(ValueError):
+            SnakeEnv(features=('unknown', ))
@@ -0,0 +1,43 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import json
+import unittest
+from metrics import LatencyHistogram, Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for nanoseconds in range(1, 100001):
+            histogram.record(nanoseconds)
+
+        self.assertEqual(histogram.count, 100000)
+        self.assertEqual(histogram.percentile(100), 100000)
+        # Log-scaled buckets: memory is bounded and percentiles are within a bucket's width
+        self.assertLess(len(histogram.buckets), 200)
+        self.assertAlmostEqual(histogram.percentile(50), 50000, delta=50000 / 8)
+        self.assertAlmostEqual(histogram.percentile(99), 99000, delta=99000 / 8)
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+    def test_merge(self):
+        metrics_a, metrics_b = Metrics(), Metrics()
+        metrics_a.count('bfs.searches')
+        metrics_b.count('bfs.searches', 2)
+        metrics_b.group = '10%'
+        metrics_b.record('decision', 1000)
+        metrics_a.merge(metrics_b)
+
+        self.assertEqual(metrics_a.counters['bfs.searches'], 3)
+        self.assertEqual(metrics_a.histograms['decision'].count, 1)
+        self.assertEqual(metrics_a.groups['10%']['decision'].count, 1)
+
+    def test_profile(self):
+        metrics = Metrics(profile=True)
+        with metrics.profiling(), metrics.timer('sort'):
+            sorted(range(1000), reverse=True)
+
+        report = json.loads(metrics.to_json())
+        self.assertEqual(report['histograms']['sort']['count'], 1)
+        self.assertTrue(report['profile'])
+        self.assertNotIn('profile', Metrics().to_dict())
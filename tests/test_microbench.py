@@ -0,0 +1,40 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import unittest
+from microbench import compare, fixture, run_suite
+
+
+class TestMicrobench(unittest.TestCase):
+    def test_fixture(self):
+        snake, apple = fixture(12, 12, 0.5)
+
+        self.assertEqual(len(snake.body), 72)
+        self.assertEqual((snake.body[0], snake.get_head()), ((0, 0), (0, 5)))
+        self.assertFalse(snake.board.is_occupied(apple.location))
+        self.assertEqual(fixture(12, 12, 0.5)[1].location, apple.location)
+
+    def test_run_suite(self):
+        results = run_suite(sizes=[(12, 12)], fills=[0.1, 0.9], repeat=2, min_time=0)
+
+        self.assertEqual(len(results), 14)
+        rows = {(row['primitive'], row['fill']): row for row in results}
+        self.assertGreater(rows['bfs', 0.1]['nodes_expanded'], rows['bfs', 0.9]['nodes_expanded'])
+        # The distances and the parents of every cell, at 8 bytes per list item
+        self.assertGreater(rows['bfs', 0.1]['peak_bytes'], 2 * 8 * 144)
+        for row in results:
+            self.assertLessEqual(row['min_ns'], row['median_ns'])
+
+    def test_compare(self):
+        baseline = run_suite(sizes=[(12, 12)], fills=[0.5], names=['bfs', 'astar'], repeat=1, min_time=0)
+        self.assertEqual(compare(baseline, baseline), [])
+
+        slower = [dict(row, median_ns=row['median_ns'] * 2) for row in baseline]
+        self.assertEqual(len(compare(slower, baseline, threshold=0.5)), 2)
+        self.assertEqual(compare(slower, baseline, threshold=1.5), [])
+
+        more_nodes = [dict(baseline[0], nodes_expanded=baseline[0]['nodes_expanded'] + 1)]
+        self.assertEqual(compare(more_nodes, baseline), ['bfs 12x12 50%: nodes_expanded 18 -> 19'])
+
+        more_memory = [dict(row, peak_bytes=row['peak_bytes'] + 1) for row in baseline]
+        self.assertEqual(len(compare(more_memory, baseline)), 2)
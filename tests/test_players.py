@@ -2,7 +2,13 @@
 # -*-coding: utf-8 -*-
 
 import unittest
-from snake import LongestPath, Snake, Apple
+from functools import partial
+
+from players import MISSING
+from snake import (
+    Astar, Base, BFS, DistanceField, Hamiltonian, LongestPath, Mixed, PlanCache, Simulator, Snake, Apple,
+    TranspositionTable, hamiltonian_cycles, manhattan, tail_tie_breaking
+)
 
 
 class TestPlayers(unittest.TestCase):
@@ -19,3 +25,136 @@ class TestPlayers(unittest.TestCase):
                 (2, 2), (2, 3), (3, 3)
             ]
         )
+
+    def test_bfs(self):
+        snake = Snake(body=[(2, 0), (2, 1), (2, 2)], cell_width=5, cell_height=5)
+        apple = Apple(cell_width=5, cell_height=5)
+        apple.location = (4, 0)
+
+        path = BFS(snake=snake, apple=apple, cell_width=5, cell_height=5).run_bfs()
+        self.assertEqual(path[0], (2, 2))
+        self.assertEqual(path[-1], (4, 0))
+        self.assertEqual(len(path), 5)
+
+        # Wall the apple off with the body
+        snake = Snake(body=[(3, 2), (3, 1), (3, 0), (4, 1), (4, 2)], cell_width=5, cell_height=5)
+        self.assertIsNone(BFS(snake=snake, apple=apple, cell_width=5, cell_height=5).run_bfs())
+
+    def test_distance_field(self):
+        snake = Snake(body=[(1, 0), (1, 1), (1, 2)], cell_width=4, cell_height=4)
+
+        field = DistanceField(board=snake.board, source=snake.get_head())
+        self.assertEqual(field.distance((0, 0)), 3)
+        self.assertEqual(field.path_to((0, 0)), [(1, 2), (0, 2), (0, 1), (0, 0)])
+        self.assertEqual(field.distance((2, 0)), 3)
+        # Occupied cells and cells outside of the board are never reached
+        self.assertIsNone(field.distance((1, 1)))
+        self.assertIsNone(field.path_to((4, 0)))
+
+    def test_astar(self):
+        snake = Snake(body=[(1, 0), (1, 1), (1, 2), (1, 3)], cell_width=6, cell_height=6)
+        apple = Apple(cell_width=6, cell_height=6)
+        apple.location = (0, 0)
+
+        bfs_path = BFS(snake=snake, apple=apple, cell_width=6, cell_height=6).run_bfs()
+        for heuristic in (manhattan, tail_tie_breaking(snake)):
+            astar = Astar(snake=snake, apple=apple, heuristic=heuristic, cell_width=6, cell_height=6)
+            path = astar.run_astar()
+            self.assertEqual(len(path), len(bfs_path))
+            self.assertEqual(path[-1], apple.location)
+            self.assertEqual(astar.next_node(), (0, 3))
+
+    def test_time_aware_bfs(self):
+        # The apple is shut in by the tail, which has moved away by the time the head gets there
+        snake = Snake(body=[(1, 0), (1, 1), (0, 1), (0, 2), (1, 2), (2, 2)], cell_width=5, cell_height=5)
+        apple = Apple(cell_width=5, cell_height=5)
+        apple.location = (0, 0)
+
+        self.assertIsNone(BFS(snake=snake, apple=apple, cell_width=5, cell_height=5).run_bfs())
+        self.assertEqual(
+            BFS(snake=snake, apple=apple, time_aware=True, cell_width=5, cell_height=5).run_bfs(),
+            [(2, 2), (2, 1), (2, 0), (1, 0), (0, 0)]
+        )
+
+    def test_time_aware_mixed_survives(self):
+        # Time aware search only finds the path, the virtual snake still has to reach its tail
+        for seed in range(10):
+            result = Simulator(
+                player_class=partial(Mixed, time_aware=True), seed=seed, max_idle_steps=128, cell_width=8, cell_height=8
+            ).run()
+            self.assertFalse(result.is_dead, seed)
+
+    def test_virtual_snake_on_a_path_longer_than_its_body(self):
+        snake = Snake(body=[(7, 4), (7, 5)], cell_width=8, cell_height=8)
+        apple = Apple(cell_width=8, cell_height=8)
+        apple.location = (7, 7)
+        mixed = Mixed(snake=snake, apple=apple, cell_width=8, cell_height=8)
+        # The virtual snake is (6, 6), (6, 7), (7, 7): the start of the path is free again, and leads to its tail
+        self.assertTrue(mixed.is_virtual_tail_reachable([(7, 5), (7, 6), (6, 6), (6, 7), (7, 7)]))
+        # With a longer body, the virtual snake is (7, 5), (7, 6), (6, 6), (6, 7), (7, 7): its head is walled in
+        snake = Snake(body=[(7, 2), (7, 3), (7, 4), (7, 5)], cell_width=8, cell_height=8)
+        mixed = Mixed(snake=snake, apple=apple, cell_width=8, cell_height=8)
+        self.assertFalse(mixed.is_virtual_tail_reachable([(7, 5), (7, 6), (6, 6), (6, 7), (7, 7)]))
+
+    def test_hamiltonian_cycles(self):
+        for cell_width, cell_height in ((4, 4), (6, 5), (5, 6)):
+            cycles = hamiltonian_cycles(cell_width, cell_height)
+            self.assertTrue(cycles)
+            for cycle, order in cycles:
+                self.assertEqual(len(set(cycle)), cell_width * cell_height)
+                for node_a, node_b in zip(cycle, cycle[1:] + cycle[:1]):
+                    self.assertEqual(sum(map(abs, Base.node_sub(node_a, node_b))), 1)
+        self.assertFalse(hamiltonian_cycles(5, 5))
+
+    def test_hamiltonian(self):
+        snake = Snake(cell_width=6, cell_height=6)
+        apple = Apple(cell_width=6, cell_height=6)
+        apple.refresh(snake=snake)
+        player = Hamiltonian(snake=snake, apple=apple, cell_width=6, cell_height=6)
+
+        for _ in range(500):
+            snake.move(new_head=player.next_node(), apple=apple)
+            self.assertFalse(snake.is_dead)
+            self.assertTrue(player.is_in_cycle_order(snake.body))
+            if snake.eaten:
+                apple.refresh(snake=snake)
+
+    def test_plan_cache(self):
+        snake = Snake(body=[(0, 0), (0, 1), (0, 2)], cell_width=5, cell_height=5)
+        apple = Apple(cell_width=5, cell_height=5)
+        apple.location = (2, 3)
+
+        plan = PlanCache()
+        plan.store(path=[(0, 2), (0, 3), (1, 3), (2, 3)], apple=apple)
+        self.assertEqual(plan.next_node(snake=snake, apple=apple), (0, 3))
+        snake.move(new_head=(0, 3), apple=apple)
+        self.assertEqual(plan.next_node(snake=snake, apple=apple), (1, 3))
+
+        # The snake did not follow the plan
+        self.assertIsNone(plan.next_node(snake=snake, apple=apple))
+
+        plan.store(path=[(0, 3), (1, 3), (2, 3)], apple=apple)
+        apple.location = (4, 4)
+        self.assertIsNone(plan.next_node(snake=snake, apple=apple))
+
+    def test_transposition_table(self):
+        table = TranspositionTable(maxsize=2)
+        table.put('a', None)
+        table.put('b', 1)
+        self.assertIsNone(table.get('a'))
+        # 'b' is now the least recently used entry
+        table.put('c', 2)
+        self.assertEqual(len(table), 2)
+        self.assertIs(table.get('b'), MISSING)
+        self.assertEqual(table.get('c'), 2)
+        self.assertEqual((table.hits, table.misses), (2, 1))
+
+        # A state asked twice is answered from the table, with the same result
+        snake = Snake(body=[(0, 0), (0, 1), (0, 2)], cell_width=5, cell_height=5)
+        apple = Apple(cell_width=5, cell_height=5)
+        apple.location = (3, 3)
+        table = TranspositionTable()
+        moves = [Mixed(snake=snake, apple=apple, transpositions=table, cell_width=5, cell_height=5).next_node()]
+        moves.append(Mixed(snake=snake, apple=apple, transpositions=table, cell_width=5, cell_height=5).next_node())
+        self.assertEqual(moves[0], moves[1])
+        self.assertEqual(table.hits, table.misses)
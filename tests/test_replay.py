@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from replay import Recorder, Replay, load_replays, save_replays
+from snake import BFS, Mixed, Simulator
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay(self):
+        simulator = Simulator(player_class=Mixed, seed=3, max_idle_steps=200, record=True, cell_width=8, cell_height=8)
+        result = simulator.run()
+        data = simulator.recorder.to_bytes()
+        # One byte per four moves
+        self.assertLess(len(data), 40 + result.steps // 4)
+
+        replay = Replay(data, checkpoint_interval=16)
+        self.assertEqual(len(replay), result.steps)
+        snake, apple = replay.seek(len(replay))
+        self.assertEqual(list(snake.body), list(simulator.snake.body))
+        self.assertEqual(snake.score, result.score)
+        self.assertEqual(snake.is_dead, result.is_dead)
+        self.assertEqual(apple.location, simulator.apple.location)
+
+    def test_seek(self):
+        simulator = Simulator(player_class=Mixed, seed=5, max_steps=150, record=True, cell_width=8, cell_height=8)
+        simulator.run()
+        replay = Replay(simulator.recorder.to_bytes(), checkpoint_interval=16)
+
+        # Play the game step by step once, then seek back and forth through the checkpoints
+        states = [(list(replay.snake.body), replay.apple.location)]
+        while replay.steps < len(replay):
+            replay.step()
+            states.append((list(replay.snake.body), replay.apple.location))
+        for step in (100, 3, 150, 0, 77, 16, 15):
+            snake, apple = replay.seek(step)
+            self.assertEqual((list(snake.body), apple.location), states[step])
+
+    def test_file(self):
+        recorders = []
+        for seed in range(3):
+            simulator = Simulator(player_class=BFS, seed=seed, record=True, cell_width=6, cell_height=6)
+            simulator.run()
+            recorders.append(simulator.recorder)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.replay')
+            save_replays(path, recorders)
+            replays = list(load_replays(path))
+
+        self.assertEqual([replay.seed for replay in replays], [0, 1, 2])
+        self.assertEqual(
+            [len(replay) for replay in replays], [recorder.count + recorder.gave_up for recorder in recorders]
+        )
+
+    def test_large_board(self):
+        # Cell indices of the body beyond 65536
+        body = [(10, 290), (11, 290), (12, 290)]
+        recorder = Recorder(cell_width=300, cell_height=300, body=body, seed=0)
+        recorder.record(head=(12, 290), new_head=(12, 291))
+
+        replay = Replay(recorder.to_bytes())
+        self.assertEqual(replay.body, body)
+        snake, _ = replay.seek(len(replay))
+        self.assertEqual(list(snake.body), [(11, 290), (12, 290), (12, 291)])
@@ -0,0 +1,49 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import time
+import unittest
+from rollout import Rollout, run_rollouts
+from snake import Apple, Simulator, Snake
+
+
+class TestRollout(unittest.TestCase):
+    def test_run_rollouts(self):
+        task = (6, 6, ((0, 0), (0, 1), (0, 2)), (3, 3), [1, 2, 3], 36, 0.1, 0.95, None)
+        results = run_rollouts(task)
+
+        self.assertEqual(results, run_rollouts(task))
+        self.assertEqual(len(results), 3)
+        for survived, reward in results:
+            self.assertLessEqual(survived, 36)
+            self.assertGreater(reward, 0)
+
+        # Past the deadline, the continuations stop on their own, even within a continuation
+        self.assertEqual(run_rollouts(task[:-1] + (time.time() - 1, )), [])
+        task = (200, 200, ((0, 0), (0, 1), (0, 2)), (3, 3), [1], 40000, 1.0, 0.95, time.time() + 0.01)
+        start = time.perf_counter()
+        self.assertEqual(run_rollouts(task), [])
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_next_node(self):
+        # Going up at (0, 1) leads into a dead end, where the tail cannot be followed
+        body = [(3, 1), (3, 0), (2, 0), (1, 0), (1, 1), (1, 2), (0, 2)]
+        snake = Snake(body=body, cell_width=5, cell_height=5)
+        apple = Apple(cell_width=5, cell_height=5)
+        apple.location = (4, 4)
+
+        player = Rollout(snake=snake, apple=apple, workers=0, budget=10, seed=0, cell_width=5, cell_height=5)
+        self.assertEqual([move for move, _, _ in player.candidates()], [(0, 3), (0, 1)])
+        self.assertEqual(player.next_node(), (0, 3))
+
+        # Out of budget, the move of Mixed is taken
+        player = Rollout(snake=snake, apple=apple, workers=0, budget=0, seed=0, cell_width=5, cell_height=5)
+        player.next_node()
+        self.assertEqual(player.metrics.counters['rollout.budget_exhausted'], 1)
+
+    def test_process_pool(self):
+        result = Simulator(
+            player_class=Rollout, seed=0, max_steps=10, cell_width=6, cell_height=6
+        ).run()
+        self.assertEqual(result.steps, 10)
+        self.assertGreater(result.metrics.counters['rollout.continuations'], 0)
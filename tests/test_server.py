@@ -0,0 +1,113 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import asyncio
+import json
+import unittest
+
+from server import GameServer
+from snake import Mixed, Simulator
+
+
+class TestGameServer(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(asyncio.wait_for(coroutine, timeout=120))
+
+    async def play(self, server: GameServer, requests: list):
+        """
+        Start games from a local client and read their messages until they are all over
+        :return: (replies to the requests, messages per session)
+        """
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b'\n')
+
+        # Games start moving as soon as they are created, their messages come along with the replies
+        replies = []
+        messages = {}
+        running = set()
+        while len(replies) < len(requests) or running:
+            message = json.loads(await asyncio.wait_for(reader.readline(), timeout=60))
+            if message['op'] == 'new':
+                replies.append(message)
+                messages[message['session']] = []
+                running.add(message['session'])
+            elif 'session' not in message:
+                replies.append(message)
+            else:
+                messages[message['session']].append(message)
+                if message['op'] in ('over', 'error'):
+                    running.discard(message['session'])
+        writer.close()
+        await writer.wait_closed()
+        return replies, messages
+
+    def test_concurrent_sessions(self):
+        self.run_async(self.concurrent_sessions())
+
+    async def concurrent_sessions(self):
+        server = await GameServer(tick=0, workers=2).start()
+        request = {'op': 'new', 'solver': 'mixed', 'width': 6, 'height': 6, 'max_idle_steps': 200}
+        replies, messages = await self.play(server, [dict(request, seed=seed) for seed in range(8)])
+        await server.close()
+
+        # Every game is the one of the simulator, whichever worker decided its moves
+        for seed, reply in enumerate(replies):
+            expected = Simulator(player_class=Mixed, seed=seed, max_idle_steps=200, cell_width=6, cell_height=6).run()
+            over = messages[reply['session']][-1]
+            self.assertEqual((over['op'], over['score'], over['steps']), ('over', expected.score, expected.steps))
+            self.assertEqual(len(messages[reply['session']]), expected.steps + 1)
+
+    def test_client_moves(self):
+        self.run_async(self.client_moves())
+
+    async def client_moves(self):
+        server = await GameServer(tick=0, workers=0).start()
+        replies, messages = await self.play(server, [
+            {'op': 'new', 'width': 5, 'height': 5},
+            {'op': 'new', 'solver': 'hamiltonian', 'width': 5, 'height': 5},
+            {'op': 'new', 'solver': 'unknown'},
+        ])
+        await server.close()
+
+        # The snake keeps going left until it leaves the board
+        session = replies[0]['session']
+        self.assertEqual([message['head'] for message in messages[session][:-1]], [[1, 0], [0, 0]])
+        self.assertTrue(messages[session][-1]['is_dead'])
+        # No Hamiltonian cycle on a 5x5 board
+        self.assertEqual(messages[replies[1]['session']][-1]['op'], 'error')
+        self.assertEqual(replies[2]['op'], 'error')
+        self.assertEqual(server.sessions, {})
+
+    def test_invalid_direction(self):
+        self.run_async(self.invalid_direction())
+
+    async def invalid_direction(self):
+        # A long tick, so that the game is still running while it is moved
+        server = await GameServer(tick=60, workers=0).start()
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+
+        async def send(request):
+            writer.write(json.dumps(request).encode() + b'\n')
+            while True:
+                message = json.loads(await reader.readline())
+                if message['op'] != 'state':
+                    return message
+
+        # Valid JSON which is not a request is answered with an error, without dropping the connection
+        self.assertEqual((await send([1]))['op'], 'error')
+        session = (await send({'op': 'new'}))['session']
+        for direction in (-1, 4, '0', None):
+            reply = await send({'op': 'move', 'session': session, 'direction': direction})
+            self.assertEqual(reply['op'], 'error')
+        self.assertEqual((await send({'op': 'close', 'session': session}))['op'], 'closed')
+        writer.close()
+        await server.close()
@@ -0,0 +1,36 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import unittest
+from snake import BFS, Hamiltonian, Mixed, Simulator
+
+
+class TestSimulator(unittest.TestCase):
+    def test_run(self):
+        result = Simulator(player_class=BFS, cell_width=6, cell_height=6).run()
+
+        self.assertEqual(result.steps, result.metrics.histograms['decision'].count)
+        self.assertTrue(result.is_dead or result.completed)
+        self.assertGreaterEqual(result.score, 0)
+
+    def test_max_steps(self):
+        result = Simulator(player_class=Mixed, cell_width=6, cell_height=6, max_steps=5).run()
+
+        self.assertEqual(result.steps, 5)
+        self.assertFalse(result.is_dead)
+
+    def test_perfect_game(self):
+        result = Simulator(player_class=Hamiltonian, seed=0, cell_width=6, cell_height=6).run()
+
+        self.assertTrue(result.completed)
+        self.assertEqual(result.score, 6 * 6 - 3)
+
+    def test_metrics(self):
+        result = Simulator(player_class=Mixed, seed=0, cell_width=6, cell_height=6, profile=True).run()
+        metrics = result.metrics.to_dict()
+
+        self.assertGreater(metrics['counters']['bfs.searches'], 0)
+        self.assertGreater(metrics['counters']['bfs.nodes_expanded'], metrics['counters']['bfs.searches'])
+        self.assertIn('mixed.bfs', metrics['histograms'])
+        self.assertEqual(sum(group['decision']['count'] for group in metrics['groups'].values()), result.steps)
+        self.assertTrue(metrics['profile'])
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import unittest
+from snake import SOLVERS, Apple, Board, Mixed, Snake, headless_solvers, main
+
+
+class TestSnake(unittest.TestCase):
+    def test_board_follows_moves(self):
+        snake = Snake(body=[(0, 0), (0, 1), (0, 2)], cell_width=5, cell_height=5)
+        apple = Apple(cell_width=5, cell_height=5)
+        apple.location = (4, 4)
+
+        snake.move(new_head=(1, 2), apple=apple)
+
+        self.assertFalse(snake.board.is_occupied((0, 0)))
+        self.assertTrue(snake.board.is_occupied((1, 2)))
+        self.assertEqual(sum(snake.board.cells), len(snake.body))
+
+    def test_dead_checking(self):
+        snake = Snake(body=[(0, 0), (1, 0), (1, 1), (0, 1)], cell_width=5, cell_height=5)
+
+        # Moving into the tail is allowed, the tail moves away at the same time
+        self.assertFalse(snake.dead_checking(head=(0, 0), check=True))
+        self.assertTrue(snake.dead_checking(head=(1, 1), check=True))
+        self.assertTrue(snake.dead_checking(head=(-1, 1), check=True))
+        self.assertFalse(snake.is_dead)
+
+    def test_cell_tables(self):
+        board = Board(cell_width=4, cell_height=3)
+        self.assertEqual(board.node(6), (2, 1))
+        # Down, up, right, left, without the ones outside the board
+        self.assertEqual(board.neighbors[board.index((0, 0))], (4, 1))
+        self.assertEqual(board.neighbors[board.index((2, 1))], (10, 2, 7, 5))
+        self.assertEqual(board.neighbors[board.index((3, 2))], (7, 10))
+
+    def test_free_cells(self):
+        snake = Snake(body=[(0, 0), (0, 1), (0, 2)], cell_width=3, cell_height=3)
+        apple = Apple(cell_width=3, cell_height=3)
+        apple.location = (2, 2)
+        self.assertEqual(len(snake.free_cells), 6)
+
+        snake.move(new_head=(1, 2), apple=apple)
+        free_cells = {snake.board.node(index) for index in snake.free_cells.cells}
+        self.assertEqual(free_cells, {(1, 0), (2, 0), (1, 1), (2, 1), (2, 2), (0, 0)})
+
+        # The last free cell, in the corner, is the only place left for an apple
+        snake = Snake(body=[(x, y) for y in range(3) for x in range(3)][:-1], cell_width=3, cell_height=3)
+        apple.refresh(snake=snake)
+        self.assertEqual(apple.location, (2, 2))
+
+    def test_apple_seed(self):
+        snake = Snake(cell_width=10, cell_height=10)
+        locations = []
+        for _ in range(2):
+            apple = Apple(seed=7, cell_width=10, cell_height=10)
+            apple.refresh(snake=snake)
+            locations.append(apple.location)
+        self.assertEqual(locations[0], locations[1])
+
+    def test_import_without_pygame(self):
+        # A fresh interpreter, as pygame may already be imported by other tests
+        code = 'import sys, snake; sys.exit("pygame" in sys.modules)'
+        self.assertEqual(subprocess.run([sys.executable, '-c', code]).returncode, 0)
+
+    def test_main_headless(self):
+        self.assertIs(SOLVERS['mixed'], Mixed)
+        # The GUI is imported, its human player is still left out of headless games
+        self.assertIn('human', SOLVERS)
+        self.assertNotIn('human', headless_solvers())
+        self.assertIn('rollout', headless_solvers())
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(['--headless', '--solver', 'human'])
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(['--headless', '--solver', 'bfs', '--width', '6', '--height', '6', '--games', '2', '--workers', '1'])
+        summary = json.loads(output.getvalue())
+        self.assertEqual((summary['solver'], summary['width'], summary['games']), ('bfs', 6, 2))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(['--headless', '--anytime', '--fps', '1000', '--width', '6', '--height', '6', '--workers', '1'])
+        self.assertEqual(json.loads(output.getvalue())['games'], 1)
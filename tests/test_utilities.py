@@ -11,3 +11,7 @@ class TestBaseFunctions(unittest.TestCase):
 
     def test_node_sub(self):
         self.assertEqual(Base().node_sub((0, 1), (2, 3)), (-2, -2))
+
+    def test_window_size(self):
+        base = Base(cell_size=10, cell_width=40, cell_height=30)
+        self.assertEqual((base.window_width, base.window_height), (400, 300))
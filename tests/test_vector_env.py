@@ -0,0 +1,51 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import random
+import unittest
+
+import numpy as np
+
+from snake import Apple, Base, Snake
+from vector_env import DIRECTIONS, VectorSnakeEnv, distance_fields
+
+
+class TestVectorSnakeEnv(unittest.TestCase):
+    def test_same_rules_as_snake(self):
+        env = VectorSnakeEnv(count=8, seed=1, cell_width=6, cell_height=5)
+        snakes = [Snake(cell_width=6, cell_height=5) for _ in range(env.count)]
+        apples = [Apple(cell_width=6, cell_height=5) for _ in range(env.count)]
+        rng = random.Random(2)
+
+        for _ in range(60):
+            actions = [rng.randrange(len(DIRECTIONS)) for _ in range(env.count)]
+            for game, (snake, apple) in enumerate(zip(snakes, apples)):
+                apple.location = snake.board.node(env.apples[game])
+                if not snake.is_dead:
+                    difference = tuple(int(value) for value in DIRECTIONS[actions[game]])
+                    snake.move(new_head=Base.node_add(snake.get_head(), difference), apple=apple)
+            env.step(actions)
+
+            for game, snake in enumerate(snakes):
+                self.assertEqual(env.dead[game], snake.is_dead)
+                self.assertEqual(env.scores[game], snake.score)
+                if not snake.is_dead:
+                    self.assertEqual(env.head_cells()[game], snake.board.index(snake.get_head()))
+                    self.assertEqual(list(env.cells[game]), list(snake.board.cells))
+
+    def test_distance_fields(self):
+        passable = np.ones((2, 3, 3), dtype=bool)
+        passable[1, 1, :2] = False
+        distances = distance_fields(np.array([0, 0]), passable)
+
+        self.assertEqual(distances[0, 2, 2], 4)
+        self.assertEqual(distances[1, 2, 0], 6)
+        self.assertEqual(distances[1, 1, 0], -1)
+
+    def test_run(self):
+        env = VectorSnakeEnv(count=16, seed=0, cell_width=6, cell_height=6)
+        scores = env.run()
+
+        self.assertTrue(env.done.all())
+        self.assertTrue((scores > 0).all())
+
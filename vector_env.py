@@ -0,0 +1,205 @@
+#!/usr/bin/python
+# -*-coding: utf-8 -*-
+
+import numpy as np
+
+import model
+from model import Base
+
+# model.DIRECTIONS as an array, indexed by a whole batch of actions at once
+DIRECTIONS = np.array(model.DIRECTIONS)
+
+
+def distance_fields(sources, passable, targets=None):
+    """
+    Batched flood fill: one BFS per grid, all grids expanding one step at a time together
+    :param sources: (N,) flat cell index of the source of every grid, i.e. y * width + x
+    :param passable: (N, height, width) boolean array. Sources do not need to be passable
+    :param targets: Optional. (N,) flat cell index per grid, which does not need to be passable either. A grid stops
+    expanding once its target is reached, so cells further than the target may be left at -1
+    :return: (N, height, width) array of the number of steps from the source, -1 for unreachable cells
+    """
+    count, height, width = passable.shape
+    grids = np.arange(count)
+    distances = np.full(passable.shape, -1, dtype=np.int32)
+    frontier = np.zeros(passable.shape, dtype=bool)
+    frontier[grids, sources // width, sources % width] = True
+    distances[frontier] = 0
+
+    if targets is not None:
+        target_y, target_x = targets // width, targets % width
+        passable = passable.copy()
+        passable[grids, target_y, target_x] = True
+
+    distance = 0
+    while frontier.any():
+        distance += 1
+        expanded = np.zeros_like(frontier)
+        expanded[:, 1:, :] |= frontier[:, :-1, :]
+        expanded[:, :-1, :] |= frontier[:, 1:, :]
+        expanded[:, :, 1:] |= frontier[:, :, :-1]
+        expanded[:, :, :-1] |= frontier[:, :, 1:]
+        frontier = expanded & passable & (distances == -1)
+        distances[frontier] = distance
+        if targets is not None:
+            frontier[distances[grids, target_y, target_x] >= 0] = False
+    return distances
+
+
+class VectorSnakeEnv(Base):
+    def __init__(self, count: int, initial_length: int = 3, seed: int = None, **kwargs):
+        """
+        N games of snake held as NumPy arrays and advanced together by one step(actions) call.
+        The game rules are the ones of Snake and Apple: the snake may move into its tail, an apple makes it grow by one
+        :param count: number of games
+        :param initial_length: The initial length of the snakes
+        :param seed: Optional. Seed of the apple locations of the whole batch
+        """
+        super().__init__(**kwargs)
+        if not 0 < initial_length < self.cell_width:
+            raise ValueError(f"Initial_length should fall in (0, {self.cell_width})")
+
+        self.count = count
+        self.initial_length = initial_length
+        self.random = np.random.default_rng(seed)
+        self.area = self.cell_width * self.cell_height
+        self.games = np.arange(count)
+
+        # Occupancy grids, flat view is indexed by y * cell_width + x like Board
+        self.grids = np.zeros((count, self.cell_height, self.cell_width), dtype=np.uint8)
+        self.cells = self.grids.reshape(count, self.area)
+        # Bodies as ring buffers of flat cell indices, from tails[i] to heads[i]
+        self.bodies = np.zeros((count, self.area), dtype=np.int32)
+        self.heads = np.zeros(count, dtype=np.int64)
+        self.tails = np.zeros(count, dtype=np.int64)
+        self.lengths = np.zeros(count, dtype=np.int64)
+        self.apples = np.full(count, -1, dtype=np.int64)
+        self.scores = np.zeros(count, dtype=np.int64)
+        self.steps = np.zeros(count, dtype=np.int64)
+        self.dead = np.zeros(count, dtype=bool)
+        self.done = np.zeros(count, dtype=bool)
+
+        self.reset()
+
+    def reset(self):
+        """
+        Start all games over, with the same initial body as Snake
+        """
+        start_x = self.cell_width // 2
+        start_y = self.cell_height // 2
+        body = [y * self.cell_width + start_x for y in range(start_y, start_y - self.initial_length, -1)]
+
+        self.cells[:] = 0
+        self.cells[:, body] = 1
+        self.bodies[:, :self.initial_length] = body
+        self.tails[:] = 0
+        self.heads[:] = self.initial_length - 1
+        self.lengths[:] = self.initial_length
+        self.scores[:] = 0
+        self.steps[:] = 0
+        self.dead[:] = False
+        self.done[:] = False
+        self.refresh_apples(np.ones(self.count, dtype=bool))
+
+    def refresh_apples(self, mask):
+        """
+        Put a new apple on a uniformly random free cell of every game in mask, -1 when no cell is free
+        """
+        games = self.games[mask]
+        if not len(games):
+            return
+        weights = self.random.random((len(games), self.area))
+        weights[self.cells[games] != 0] = -1
+        apples = weights.argmax(axis=1)
+        apples[weights[np.arange(len(games)), apples] < 0] = -1
+        self.apples[games] = apples
+
+    def head_cells(self):
+        return self.bodies[self.games, self.heads]
+
+    def tail_cells(self):
+        return self.bodies[self.games, self.tails]
+
+    def step(self, actions):
+        """
+        Move every game which is not done yet
+        :param actions: (N,) indices into DIRECTIONS, ignored for games which are done
+        :return: (rewards, done): 1 for eating an apple, -1 for dying, 0 otherwise, and whether each game is over
+        """
+        active = ~self.done
+        head = self.head_cells()
+        tail = self.tail_cells()
+        differences = DIRECTIONS[np.asarray(actions)]
+        x = head % self.cell_width + differences[:, 0]
+        y = head // self.cell_width + differences[:, 1]
+
+        inside = (0 <= x) & (x < self.cell_width) & (0 <= y) & (y < self.cell_height)
+        new_head = np.where(inside, y * self.cell_width + x, 0)
+        # The tail is not an obstacle, it moves forward together with the head
+        collision = (self.cells[self.games, new_head] != 0) & (new_head != tail)
+        dying = active & (~inside | collision)
+        moving = active & ~dying
+        eating = moving & (new_head == self.apples)
+
+        cutting = moving & ~eating
+        self.cells[self.games[cutting], tail[cutting]] -= 1
+        self.tails[cutting] = (self.tails[cutting] + 1) % self.area
+
+        self.heads[moving] = (self.heads[moving] + 1) % self.area
+        self.bodies[self.games[moving], self.heads[moving]] = new_head[moving]
+        self.cells[self.games[moving], new_head[moving]] += 1
+
+        self.lengths[eating] += 1
+        self.scores[eating] += 1
+        self.steps[active] += 1
+        self.dead |= dying
+
+        completed = self.lengths >= self.area
+        self.done |= dying | completed
+        self.refresh_apples(eating & ~completed)
+
+        rewards = eating.astype(np.int64) - dying.astype(np.int64)
+        return rewards, self.done.copy()
+
+    def bfs_actions(self):
+        """
+        The BFS solver for all games at once: one batched flood fill from the apples, then every head moves to the
+        neighbour closest to its apple. Heads without a way to the apple move to any free neighbour, if there is one
+        :return: (N,) indices into DIRECTIONS
+        """
+        actions = np.zeros(self.count, dtype=np.int64)
+        games = self.games[~self.done & (self.apples >= 0)]
+        if not len(games):
+            return actions
+
+        # Flood from the apples until the heads are reached: the neighbours of a head on a shortest path are then
+        # the ones with the smallest distance
+        head = self.head_cells()[games]
+        passable = self.grids[games] == 0
+        distances = distance_fields(self.apples[games], passable, targets=head).reshape(len(games), self.area)
+
+        rows = np.arange(len(games))
+        scores = np.full((len(games), len(DIRECTIONS)), np.iinfo(np.int32).max, dtype=np.int64)
+        for action, (dx, dy) in enumerate(DIRECTIONS):
+            x = head % self.cell_width + dx
+            y = head // self.cell_width + dy
+            inside = (0 <= x) & (x < self.cell_width) & (0 <= y) & (y < self.cell_height)
+            neighbor = np.where(inside, y * self.cell_width + x, 0)
+            free = inside & (self.cells[games, neighbor] == 0)
+            distance = distances[rows, neighbor]
+            # Reachable neighbours rank by their distance, other free neighbours after them
+            scores[:, action] = np.where(free & (distance >= 0), distance, np.where(free, self.area, scores[:, action]))
+        actions[games] = scores.argmin(axis=1)
+        return actions
+
+    def run(self, max_steps: int = None):
+        """
+        Play all games to the end with bfs_actions
+        :param max_steps: Optional. Stop after this many steps, as a head without a way to its apple may circle forever
+        :return: (N,) scores
+        """
+        step = 0
+        while not self.done.all() and (max_steps is None or step < max_steps):
+            self.step(self.bfs_actions())
+            step += 1
+        return self.scores.copy()